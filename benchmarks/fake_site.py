@@ -0,0 +1,218 @@
+"""
+Локальные заменители Flashscore и прокси для нагрузочных прогонов
+(benchmarks.loadsim): сайт отдаёт сгенерированные страницы составов,
+прокси пересылают к нему запросы, добавляя задержку, обрывы, 5xx и 429.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+from benchmarks.pages import make_squad, render_squad_page
+
+# Флаг сборной из NATIONAL_TEAM_FLAGS и произвольный флаг клуба
+NATIONAL_FLAG = "fl_1"
+CLUB_FLAG = "fl_200"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Sequence[Tuple[str, str]] = ()) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server:
+    """Общая часть: ThreadingHTTPServer на свободном порту 127.0.0.1 в фоновом потоке."""
+
+    handler: type = _Handler
+
+    def __init__(self) -> None:
+        self.httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "_Server":
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.daemon_threads = True
+        self.httpd.owner = self
+        threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+class _SiteHandler(_Handler):
+    def do_GET(self) -> None:
+        html = self.server.owner.page(self.path)
+        if html is None:
+            self._send(404, b"not found")
+        else:
+            self._send(200, html.encode("utf-8"))
+
+
+class FakeFlashscore(_Server):
+    """
+    Сайт со страницами /team/<fl_slug>/<fl_id>/squad/ для заданных команд
+    в разметке, которую читает SquadScraper. С вероятностью churn запрос
+    меняет состав команды (новая версия страницы), иначе отдаётся прежняя.
+    """
+
+    handler = _SiteHandler
+
+    def __init__(self, teams: Sequence[Dict[str, Any]], *, churn: float = 0.0, page_kb: int = 50, seed: int = 0):
+        super().__init__()
+        self.teams = {f"/team/{t['fl_slug']}/{t['fl_id']}/squad/": t for t in teams}
+        self.churn = churn
+        self.page_kb = page_kb
+        self._rnd = random.Random(seed)
+        self._versions: Dict[int, int] = {}
+        self._pages: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.address}"
+
+    def page(self, path: str) -> Optional[str]:
+        team = self.teams.get(path.split("?")[0])
+        if team is None:
+            return None
+        with self._lock:
+            version = self._versions.get(team["id"], 0)
+            if self.churn and self._rnd.random() < self.churn:
+                version = self._versions[team["id"]] = version + 1
+            html = self._pages.get((team["id"], version))
+        if html is None:
+            html = render_squad_page(
+                make_squad(team["id"] * 1000 + version),
+                NATIONAL_FLAG if team["is_national"] else CLUB_FLAG,
+                team_name=team["fl_slug"],
+                padding_kb=self.page_kb,
+            )
+            with self._lock:
+                self._pages.pop((team["id"], version - 1), None)
+                self._pages[(team["id"], version)] = html
+        return html
+
+
+@dataclass(frozen=True)
+class ProxyBehaviour:
+    """
+    Поведение прокси: задержка latency ± jitter секунд на запрос, доли
+    обрывов соединения (drop_rate), ответов 502 (error_rate) и 429
+    (rate_limit_rate, с Retry-After, если он задан); при max_rps > 0 прокси
+    отвечает 429 на запросы сверх max_rps за последнюю секунду.
+    """
+
+    latency: float = 0.05
+    jitter: float = 0.02
+    drop_rate: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: Optional[int] = None
+    max_rps: float = 0.0
+
+
+# Исходы запроса через прокси: доставлена страница, обрыв, 502, 429, прочий ответ сайта
+OUTCOMES = ("ok", "dropped", "error", "rate_limited", "upstream_error")
+
+
+class _ProxyHandler(_Handler):
+    def do_GET(self) -> None:
+        proxy: FakeProxy = self.server.owner
+        outcome = proxy.decide()
+        if outcome == "dropped":
+            proxy.count(outcome)
+            self.close_connection = True
+            self.connection.close()
+            return
+        if outcome == "error":
+            proxy.count(outcome)
+            self._send(502, b"bad gateway")
+            return
+        if outcome == "rate_limited":
+            proxy.count(outcome)
+            retry_after = proxy.behaviour.retry_after
+            self._send(429, b"too many requests", [("Retry-After", str(retry_after))] if retry_after is not None else [])
+            return
+        # self.path — абсолютный URL: клиент обращается к нам как к HTTP-прокси
+        try:
+            with proxy.opener.open(self.path, timeout=30) as resp:
+                status, body = resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            status, body = exc.code, exc.read()
+        proxy.count("ok" if status < 400 else "upstream_error")
+        self._send(status, body)
+
+
+class FakeProxy(_Server):
+    """HTTP-прокси, пересылающий запросы к сайту с искажениями по ProxyBehaviour."""
+
+    handler = _ProxyHandler
+
+    def __init__(self, behaviour: ProxyBehaviour, seed: int = 0):
+        super().__init__()
+        self.behaviour = behaviour
+        self.opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        self.stats: Dict[str, int] = dict.fromkeys(OUTCOMES, 0)
+        self._rnd = random.Random(seed)
+        self._recent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def decide(self) -> str:
+        """Выдерживает задержку и выбирает исход запроса."""
+        b = self.behaviour
+        with self._lock:
+            delay = max(0.0, b.latency + self._rnd.uniform(-b.jitter, b.jitter))
+            roll = self._rnd.random()
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and self._recent[0] <= now - 1:
+                self._recent.popleft()
+            over_limit = b.max_rps > 0 and len(self._recent) > b.max_rps
+        time.sleep(delay)
+        if roll < b.drop_rate:
+            return "dropped"
+        roll -= b.drop_rate
+        if roll < b.error_rate:
+            return "error"
+        roll -= b.error_rate
+        if over_limit or roll < b.rate_limit_rate:
+            return "rate_limited"
+        return "ok"
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+
+def write_proxy_file(proxies: Sequence[FakeProxy], path: Path | str) -> Path:
+    """Пишет прокси в формате ProxyPool (host:port:user:pass)."""
+    path = Path(path)
+    path.write_text("".join(f"{p.address}:sim:sim\n" for p in proxies))
+    return path
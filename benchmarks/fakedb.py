@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from benchmarks.pages import COUNTRIES
+
+SCHEMA = """
+CREATE TABLE countries (
+    id INTEGER PRIMARY KEY,
+    common_title TEXT NOT NULL
+);
+CREATE TABLE hockey_competitions (
+    id INTEGER PRIMARY KEY
+);
+CREATE TABLE hockey_teams (
+    id INTEGER PRIMARY KEY,
+    fl_id TEXT NOT NULL,
+    fl_slug TEXT NOT NULL,
+    is_national INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+CREATE TABLE hockey_team_to_competitions (
+    team_id INTEGER NOT NULL,
+    competition_id INTEGER NOT NULL,
+    is_primary INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE hockey_players (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    fl_id TEXT NOT NULL,
+    fl_slug TEXT,
+    position TEXT,
+    number INTEGER,
+    country_id INTEGER,
+    first_name TEXT,
+    last_name TEXT,
+    team_id INTEGER,
+    national_team_id INTEGER,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX hockey_players_fl_id ON hockey_players (fl_id);
+CREATE TABLE hockey_player_translations (
+    hockey_player_id INTEGER NOT NULL,
+    locale TEXT NOT NULL,
+    title TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    locale_enabled INTEGER
+);
+"""
+
+_NOW = re.compile(r"\bNOW\(\)")
+_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+
+def _to_sqlite(sql: str) -> str:
+    return _NOW.sub("CURRENT_TIMESTAMP", sql.replace("%s", "?"))
+
+
+def _to_sqlite_args(args: Optional[Sequence[Any]]) -> List[Any]:
+    """datetime передаётся в формате CURRENT_TIMESTAMP, чтобы сравнения строк работали."""
+    return [a.strftime("%Y-%m-%d %H:%M:%S") if isinstance(a, datetime) else a for a in args or ()]
+
+
+def _from_sqlite(value: Any) -> Any:
+    """Даты sqlite возвращаются как datetime — так же, как DATETIME у pymysql."""
+    if isinstance(value, str) and len(value) == 19 and _DATETIME.fullmatch(value):
+        return datetime.fromisoformat(value)
+    return value
+
+
+class FakeCursor:
+    """Курсор поверх sqlite3 с интерфейсом pymysql DictCursor и счётчиком запросов."""
+
+    def __init__(self, conn: sqlite3.Connection, as_tuples: bool = False) -> None:
+        self._cur = conn.cursor()
+        self.as_tuples = as_tuples
+        self.statements = 0
+        self.lastrowid: Optional[int] = None
+        self.rowcount = -1
+
+    def execute(self, sql: str, args: Optional[Sequence[Any]] = None) -> int:
+        self.statements += 1
+        self._cur.execute(_to_sqlite(sql), _to_sqlite_args(args))
+        self.lastrowid = self._cur.lastrowid
+        self.rowcount = self._cur.rowcount
+        return self.rowcount
+
+    def executemany(self, sql: str, args: Sequence[Sequence[Any]]) -> int:
+        self.statements += 1
+        self._cur.executemany(_to_sqlite(sql), [_to_sqlite_args(a) for a in args])
+        self.rowcount = self._cur.rowcount
+        return self.rowcount
+
+    def _row(self, values: Optional[tuple]) -> Any:
+        if values is None:
+            return None
+        if self.as_tuples:
+            return tuple(_from_sqlite(val) for val in values)
+        return {col[0]: _from_sqlite(val) for col, val in zip(self._cur.description, values)}
+
+    def fetchone(self) -> Optional[Dict[str, Any]]:
+        return self._row(self._cur.fetchone())
+
+    def fetchall(self) -> List[Dict[str, Any]]:
+        return [self._row(values) for values in self._cur.fetchall()]
+
+    def __iter__(self) -> Iterator[Any]:
+        for values in self._cur:
+            yield self._row(values)
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class FakeDB:
+    """
+    Локальная замена infrastructure.db.DB на sqlite3 в памяти: те же атрибуты
+    conn/cur, transaction(), read() и stream() (на том же соединении), SQL репозиториев
+    переводится в диалект sqlite.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.cur = FakeCursor(self.conn)
+
+    @contextmanager
+    def read(self) -> Iterator[FakeCursor]:
+        yield self.cur
+
+    @contextmanager
+    def stream(self) -> Iterator[FakeCursor]:
+        cur = FakeCursor(self.conn, as_tuples=True)
+        try:
+            yield cur
+        finally:
+            self.cur.statements += cur.statements
+            cur.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[FakeCursor]:
+        try:
+            yield self.cur
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def seed_countries(self) -> None:
+        self.conn.executemany(
+            "INSERT INTO countries (id, common_title) VALUES (?, ?)",
+            [(i, title) for i, title in enumerate(COUNTRIES, start=1)],
+        )
+        self.conn.commit()
+
+    def seed_teams(self, teams: Sequence[Dict[str, Any]]) -> None:
+        self.conn.executemany(
+            "INSERT INTO hockey_teams (id, fl_id, fl_slug, is_national) VALUES (?, ?, ?, ?)",
+            [(t["id"], t["fl_id"], t["fl_slug"], t["is_national"]) for t in teams],
+        )
+        self.conn.commit()
+
+    def seed_players(self, count: int, teams: int = 2000, start_id: int = 1) -> None:
+        """Заполняет hockey_players count синтетическими игроками, распределёнными по teams командам."""
+        rows = (
+            (
+                pid, f"P. Player{pid}", f"fl{pid:08d}", f"player-{pid}",
+                ("goalkeeper", "defender", "forward")[pid % 3], pid % 99 + 1,
+                pid % len(COUNTRIES) + 1, "Player", f"Player{pid}",
+                pid % teams + 1, (pid % 40 + 1) if pid % 7 == 0 else None,
+            )
+            for pid in range(start_id, start_id + count)
+        )
+        self.conn.executemany(
+            """
+            INSERT INTO hockey_players
+                (id, name, fl_id, fl_slug, position, number, country_id,
+                 first_name, last_name, team_id, national_team_id, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            rows,
+        )
+        self.conn.commit()
@@ -0,0 +1,180 @@
+"""
+Нагрузочный прогон без Flashscore и MySQL: FakeFlashscore со
+сгенерированными страницами, несколько FakeProxy с задержкой, обрывами,
+5xx и 429, sqlite-замена БД. Циклы выполняются тем же шагом, что и в
+runner (SCHEDULER=sweep), результат — JSON с командами в минуту, p50/p99
+загрузки страницы и впустую потраченными попытками:
+
+    python -m benchmarks.loadsim --teams 300 --proxies 8 --workers 8 --rate-limit-rate 0.05
+"""
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("INITIAL_DELAY_MIN", "0")
+os.environ.setdefault("INITIAL_DELAY_MAX", "0")
+
+import argparse
+import dataclasses
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from hockey_squad_scraper import runner
+from hockey_squad_scraper.infrastructure.config import Settings
+from hockey_squad_scraper.infrastructure.fingerprints import FingerprintStore
+from hockey_squad_scraper.infrastructure.http_client import RATE_LIMITED, SERVER, TRANSPORT, HttpClient
+from hockey_squad_scraper.infrastructure.logger import logger
+from hockey_squad_scraper.infrastructure.metrics import FETCH_RETRIES, RATE_LIMIT_WAIT, TEAMS
+from hockey_squad_scraper.repositories.teams_repo import TeamsRepo
+from hockey_squad_scraper.scraping.scraper import SquadScraper
+
+from benchmarks.fake_site import OUTCOMES, FakeFlashscore, FakeProxy, ProxyBehaviour, write_proxy_file
+from benchmarks.fakedb import FakeDB
+
+
+def make_teams(count: int, national_every: int = 10) -> List[Dict[str, Any]]:
+    return [
+        {"id": i, "fl_id": f"T{i:07d}", "fl_slug": f"team-{i}", "is_national": int(i % national_every == 0)}
+        for i in range(1, count + 1)
+    ]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def timed(get: Callable[..., str], durations: List[float]) -> Callable[..., str]:
+    """Оборачивает HttpClient.get: длительность успешной загрузки страницы с повторами и ожиданиями."""
+    def wrapper(url: str, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        html = get(url, **kwargs)
+        durations.append(time.perf_counter() - started)
+        return html
+    return wrapper
+
+
+def simulate(args: argparse.Namespace) -> Dict[str, Any]:
+    teams = make_teams(args.teams)
+    behaviour = ProxyBehaviour(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        max_rps=args.proxy_max_rps,
+    )
+    site = FakeFlashscore(teams, churn=args.churn, page_kb=args.page_kb).start()
+    proxies = [FakeProxy(behaviour, seed=i).start() for i in range(args.proxies)]
+    state_dir = Path(tempfile.mkdtemp(prefix="loadsim-"))
+
+    overrides: Dict[str, Any] = dict(
+        flashscore_base_url=site.url,
+        proxy_file=str(write_proxy_file(proxies, state_dir / "proxies.txt")),
+        fetch_workers=args.workers,
+        initial_delay_range=(0, 0),
+        main_loop_delay=0,
+        state_dir=str(state_dir),
+        cache_snapshot=False,
+    )
+    if args.proxy_rate is not None:
+        overrides["proxy_rate"] = args.proxy_rate
+    if args.parse_processes is not None:
+        overrides["parse_processes"] = args.parse_processes
+    cfg = dataclasses.replace(Settings(), **overrides)
+
+    db = FakeDB()
+    db.seed_countries()
+    db.seed_teams(teams)
+    db.seed_players(args.players, teams=args.teams)
+    players_repo, countries_repo = runner._warm_up(cfg, db)
+    http = HttpClient(cfg)
+    durations: List[float] = []
+    http.get = timed(http.get, durations)
+    scraper = SquadScraper(
+        db=db,
+        http=http,
+        teams_repo=TeamsRepo(db),
+        players_repo=players_repo,
+        countries_repo=countries_repo,
+        cfg=cfg,
+        fingerprints=FingerprintStore(state_dir / "fingerprints.json") if cfg.skip_unchanged else None,
+    )
+    step = runner._sweep_step(cfg, scraper, http)
+
+    outcomes = ("changed", "unchanged", "failed")
+    teams_before = {o: TEAMS.value(outcome=o) for o in outcomes}
+    retries_before = {r: FETCH_RETRIES.value(reason=r) for r in (TRANSPORT, RATE_LIMITED, SERVER)}
+    wait_before = RATE_LIMIT_WAIT.total()
+    started = time.perf_counter()
+    try:
+        for _ in range(args.cycles):
+            step()
+    finally:
+        elapsed = time.perf_counter() - started
+        scraper.close()
+        for proxy in proxies:
+            proxy.stop()
+        site.stop()
+        db.close()
+
+    done = {o: int(TEAMS.value(outcome=o) - teams_before[o]) for o in outcomes}
+    proxy_stats = {o: sum(p.stats[o] for p in proxies) for o in OUTCOMES}
+    attempts = sum(proxy_stats.values())
+    durations.sort()
+    return {
+        "config": {
+            **{k: v for k, v in vars(args).items() if k != "output"},
+            "proxy_rate": cfg.proxy_rate,
+            "host_rate": cfg.host_rate,
+            "max_retries": cfg.max_retries,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "teams": done,
+        "teams_per_minute": round((done["changed"] + done["unchanged"]) / elapsed * 60, 1),
+        "fetch_p50_ms": round(percentile(durations, 0.5) * 1000, 1),
+        "fetch_p99_ms": round(percentile(durations, 0.99) * 1000, 1),
+        "attempts": attempts,
+        "wasted_attempts": attempts - proxy_stats["ok"],
+        "proxy_outcomes": proxy_stats,
+        "retries": {r: int(FETCH_RETRIES.value(reason=r) - n) for r, n in retries_before.items()},
+        "rate_limit_wait_s": round(RATE_LIMIT_WAIT.total() - wait_before, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--players", type=int, default=10000, help="размер таблицы игроков")
+    parser.add_argument("--cycles", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=8, help="FETCH_WORKERS")
+    parser.add_argument("--parse-processes", type=int, help="PARSE_PROCESSES (по умолчанию из окружения)")
+    parser.add_argument("--proxies", type=int, default=8)
+    parser.add_argument("--proxy-rate", type=float, help="PROXY_RATE (по умолчанию из окружения)")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка прокси, с")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--drop-rate", type=float, default=0.01, help="доля обрывов соединения")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="доля ответов 502")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02, help="доля ответов 429")
+    parser.add_argument("--retry-after", type=int, help="Retry-After в ответах 429, с")
+    parser.add_argument("--proxy-max-rps", type=float, default=0, help="429 сверх стольких запросов в секунду на прокси")
+    parser.add_argument("--churn", type=float, default=0.1, help="вероятность смены состава при запросе")
+    parser.add_argument("--page-kb", type=int, default=50, help="размер «обвязки» страницы")
+    parser.add_argument("--verbose", action="store_true", help="не отключать логи скрапера")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.disable("hockey_squad_scraper")
+    text = json.dumps(simulate(args), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
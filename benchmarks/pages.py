@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+from html import escape
+from typing import Dict, List, Optional, Sequence, Tuple
+
+FIRST_NAMES = (
+    "Connor", "Auston", "Nathan", "Leon", "Sidney", "Alexander", "Nikita", "Cale", "Jack",
+    "Elias", "Mikko", "Kirill", "Artemi", "Igor", "Andrei", "Juuse", "Filip", "Rasmus",
+    "Quinn", "Matthew", "Mitchell", "Brady", "Kaapo", "Lucas", "Tim", "Jesper", "Roman",
+)
+LAST_NAMES = (
+    "McDavid", "Matthews", "MacKinnon", "Draisaitl", "Crosby", "Ovechkin", "Kucherov",
+    "Makar", "Eichel", "Pettersson", "Rantanen", "Kaprizov", "Panarin", "Shesterkin",
+    "Vasilevskiy", "Saros", "Forsberg", "Dahlin", "Hughes", "Tkachuk", "Marner", "Kakko",
+    "Raymond", "Stützle", "Bratt", "Josi", "Nylander", "Gaudreau", "Larkin", "Kopitar",
+)
+COUNTRIES = (
+    "Canada", "USA", "Sweden", "Finland", "Russia", "Czech Republic", "Slovakia",
+    "Switzerland", "Germany", "Latvia", "Denmark", "Norway", "Austria", "Slovenia",
+)
+SQUAD_SHAPE = (("Goalkeepers", 3), ("Defenders", 9), ("Forwards", 15), ("Coach", 2))
+
+Player = Tuple[str, Optional[int], str, str, str, str]
+
+
+def make_squad(seed: int, shape: Sequence[Tuple[str, int]] = SQUAD_SHAPE) -> List[Player]:
+    """Детерминированный состав: (таблица, номер, имя, slug, fl_id, страна)."""
+    rnd = random.Random(seed)
+    squad: List[Player] = []
+    for title, size in shape:
+        for _ in range(size):
+            last, first = rnd.choice(LAST_NAMES), rnd.choice(FIRST_NAMES)
+            name = f"{last} {first}" if rnd.random() > 0.05 else f"{last} {first} Jr."
+            number = rnd.randint(1, 98) if title != "Coach" and rnd.random() > 0.1 else None
+            fl_id = "".join(rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789") for _ in range(8))
+            slug = f"{last}-{first}".lower()
+            squad.append((title, number, name, slug, fl_id, rnd.choice(COUNTRIES)))
+    return squad
+
+
+def render_squad_page(squad: Sequence[Player], flag: str, team_name: str = "Team", padding_kb: int = 200) -> str:
+    """
+    Страница состава в разметке Flashscore, которую читает SquadScraper,
+    с «тяжёлым» окружением (меню, скрипты), как у настоящей страницы.
+    """
+    out = [
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+        f"<title>{escape(team_name)} squad | Flashscore.com</title>",
+        "<script>window.environment = {\"config\": \"" + "x" * (padding_kb * 512) + "\"};</script>",
+        "</head><body><div id=\"header\"><nav class=\"menu\">",
+    ]
+    out.extend(
+        f'<a class="menuTop__item" href="/hockey/league-{i}/">League {i}</a>' for i in range(padding_kb * 8)
+    )
+    out.append(
+        '</nav></div><div class="container"><nav class="breadcrumb">'
+        '<a class="breadcrumb__link" href="/hockey/">Hockey</a>'
+        f'<span class="breadcrumb__flag flag {flag}"></span>'
+        f'<a class="breadcrumb__link" href="#">{escape(team_name)}</a></nav>'
+        '<div class="heading"><div class="heading__name">' + escape(team_name) + "</div></div>"
+        '<div id="overall-all-table" class="lineup">'
+    )
+    tables: dict[str, list[Player]] = {}
+    for player in squad:
+        tables.setdefault(player[0], []).append(player)
+    for title, players in tables.items():
+        out.append(f'<div class="lineupTable lineupTable--hockey"><div class="lineupTable__title">{title}</div>')
+        for _, number, name, slug, fl_id, country in players:
+            out.append(
+                '<div class="lineupTable__row">'
+                f'<div class="lineupTable__cell lineupTable__cell--jersey">{"" if number is None else number}</div>'
+                '<div class="lineupTable__cell lineupTable__cell--player">'
+                f'<div class="lineupTable__cell--flag flag fl_{COUNTRIES.index(country) + 10}" title="{escape(country)}"></div>'
+                f'<a class="lineupTable__cell--name" href="/player/{slug}/{fl_id}/">{escape(name)}</a>'
+                "</div>"
+                f'<div class="lineupTable__cell lineupTable__cell--age">{20 + len(name) % 15}</div>'
+                '<div class="lineupTable__cell lineupTable__cell--matchesPlayed">0</div>'
+                "</div>"
+            )
+        out.append("</div>")
+    out.append('</div></div><div id="footer">' + "<p>footer</p>" * 200 + "</div></body></html>")
+    return "".join(out)
+
+
+# Синтетические страницы бенчмарков: имя → (seed состава, форма состава, флаг, команда)
+SYNTHETIC_PAGES = {
+    "club_team": (1, SQUAD_SHAPE, "fl_39", "Toronto Maple Leafs"),
+    "national_team": (2, (("Goalkeepers", 3), ("Defenders", 8), ("Forwards", 14), ("Coach", 3)), "fl_8", "Canada"),
+}
+
+
+def synthetic_pages() -> Dict[str, str]:
+    """Генерирует синтетические страницы (детерминированно, ~220 КБ каждая)."""
+    return {
+        name: render_squad_page(make_squad(seed, shape), flag=flag, team_name=team_name)
+        for name, (seed, shape, flag, team_name) in SYNTHETIC_PAGES.items()
+    }
@@ -0,0 +1,34 @@
+"""
+Сохраняет настоящую страницу состава в benchmarks/fixtures через HttpClient:
+
+    python -m benchmarks.record <fl_slug> <fl_id> <name>
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from hockey_squad_scraper.infrastructure.config import Settings
+from hockey_squad_scraper.infrastructure.http_client import HttpClient
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("fl_slug")
+    parser.add_argument("fl_id")
+    parser.add_argument("name", help="имя файла без расширения, например club_nhl")
+    args = parser.parse_args()
+
+    cfg = Settings()
+    http = HttpClient(cfg)
+    html = http.get(f"{cfg.flashscore_base_url}/team/{args.fl_slug}/{args.fl_id}/squad/")
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    path = FIXTURES_DIR / f"{args.name}.html"
+    path.write_text(html, encoding="utf-8")
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
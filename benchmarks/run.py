@@ -0,0 +1,227 @@
+"""
+Офлайн-бенчмарки горячих путей: разбор страниц, синхронизация состава и
+операции PlayersRepo на sqlite-замене БД. Результат — JSON:
+
+    python -m benchmarks.run --sizes 10000,50000,200000 --output bench.json
+"""
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("INITIAL_DELAY_MIN", "0")
+os.environ.setdefault("INITIAL_DELAY_MAX", "0")
+
+import argparse
+import dataclasses
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from hockey_squad_scraper.infrastructure.config import Settings
+from hockey_squad_scraper.infrastructure.fingerprints import FingerprintStore
+from hockey_squad_scraper.infrastructure.logger import logger
+from hockey_squad_scraper.repositories.countries_repo import CountriesRepo
+from hockey_squad_scraper.repositories.players_repo import PlayersRepo
+from hockey_squad_scraper.repositories.teams_repo import TeamsRepo
+from hockey_squad_scraper.scraping.extractors import EXTRACTORS
+from hockey_squad_scraper.scraping.fingerprint import squad_fingerprint
+from hockey_squad_scraper.scraping.scraper import SquadScraper
+
+from benchmarks.fakedb import FakeDB
+from benchmarks.pages import synthetic_pages
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class FixtureHttp:
+    """HttpClient, отдающий заранее сохранённую страницу на любой URL."""
+
+    def __init__(self, html: str) -> None:
+        self.html = html
+
+    def get(self, url: str, **_: Any) -> str:
+        return self.html
+
+    def close(self) -> None:
+        pass
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int, **params: Any) -> Dict[str, Any]:
+    """Запускает fn repeat раз и возвращает статистику длительностей в миллисекундах."""
+    durations: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "name": name,
+        **params,
+        "repeat": repeat,
+        "mean_ms": round(statistics.fmean(durations), 4),
+        "p50_ms": round(durations[len(durations) // 2], 4),
+        "p95_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 4),
+        "min_ms": round(durations[0], 4),
+    }
+
+
+def load_fixtures() -> Dict[str, str]:
+    """Синтетические страницы из benchmarks.pages и настоящие, сохранённые record.py в fixtures/."""
+    fixtures = synthetic_pages()
+    fixtures.update(
+        (path.stem, path.read_text(encoding="utf-8")) for path in sorted(FIXTURES_DIR.glob("*.html"))
+    )
+    return fixtures
+
+
+def make_scraper(
+    db: FakeDB, html: str, cfg: Settings, fingerprints: Optional[FingerprintStore] = None
+) -> SquadScraper:
+    return SquadScraper(
+        db=db,
+        http=FixtureHttp(html),
+        teams_repo=TeamsRepo(db),
+        players_repo=PlayersRepo(db, write_through=cfg.cache_write_through),
+        countries_repo=CountriesRepo(db),
+        cfg=cfg,
+        fingerprints=fingerprints,
+    )
+
+
+def bench_parsing(fixtures: Dict[str, str], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    lookup = {}.get
+    team = {"id": 1}
+    for fixture, html in fixtures.items():
+        results.append(measure("fingerprint", lambda: squad_fingerprint(html), repeat, fixture=fixture))
+        for backend, cls in EXTRACTORS.items():
+            extractor = cls(lookup)
+            results.append(measure(
+                "extract", lambda: extractor.extract(html, team), repeat, fixture=fixture, backend=backend,
+            ))
+    return results
+
+
+def bench_process_team(fixtures: Dict[str, str], size: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    base_cfg = dataclasses.replace(Settings(), fetch_workers=1, cache_reload_every=0)
+    for fixture, html in fixtures.items():
+        for backend in EXTRACTORS:
+            cfg = dataclasses.replace(base_cfg, extractor=backend)
+            db = FakeDB()
+            db.seed_countries()
+            db.seed_players(size)
+            scraper = make_scraper(db, html, cfg)
+            teams = [
+                {"id": 900001, "fl_id": "a", "fl_slug": "a", "is_national": 0},
+                {"id": 900002, "fl_id": "b", "fl_slug": "b", "is_national": 0},
+            ]
+            scraper._process_team(dict(teams[0]))
+            rotation = iter(range(1, 10 ** 9))
+
+            def transfer() -> None:
+                scraper._process_team(dict(teams[next(rotation) % 2]))
+
+            statements = db.cur.statements
+            results.append(measure(
+                "process_team.transfer", transfer, repeat, fixture=fixture, backend=backend, size=size,
+            ))
+            results[-1]["statements_per_team"] = round((db.cur.statements - statements) / repeat, 2)
+
+            team = dict(teams[0])
+            scraper._process_team(team)
+            results.append(measure(
+                "process_team.unchanged", lambda: scraper._process_team(team), repeat,
+                fixture=fixture, backend=backend, size=size,
+            ))
+
+            scraper.fingerprints = FingerprintStore(Path(tempfile.mkdtemp()) / "fingerprints.json")
+            scraper._process_team(team)
+            scraper.force_full_sync = False
+            results.append(measure(
+                "process_team.fingerprint_hit", lambda: scraper._process_team(team), repeat,
+                fixture=fixture, backend=backend, size=size,
+            ))
+    return results
+
+
+def bench_players_repo(size: int, repeat: int) -> List[Dict[str, Any]]:
+    db = FakeDB()
+    db.seed_players(size)
+    repo = PlayersRepo(db)
+    results = [measure("players_repo.refresh_cache", repo.refresh_cache, max(1, repeat // 10), size=size)]
+
+    fl_ids = [f"fl{pid:08d}" for pid in range(1, size + 1, max(1, size // 30))][:30]
+    results.append(measure(
+        "players_repo.find_by_fl_id", lambda: [repo.find_by_fl_id(fl) for fl in fl_ids], repeat,
+        size=size, batch=len(fl_ids),
+    ))
+    results.append(measure(
+        "players_repo.find_many_by_fl_id", lambda: repo.find_many_by_fl_id(fl_ids), repeat,
+        size=size, batch=len(fl_ids),
+    ))
+    results.append(measure("players_repo.squad_ids", lambda: repo.squad_ids(1, True), repeat, size=size))
+
+    ids = [repo.find_by_fl_id(fl)["id"] for fl in fl_ids]
+    flip = iter(range(10 ** 9))
+
+    def update() -> None:
+        number = next(flip) % 99 + 1
+        repo.update_players({pid: {"number": number, "position": "forward"} for pid in ids})
+
+    results.append(measure("players_repo.update_players", update, repeat, size=size, batch=len(ids)))
+    results.append(measure(
+        "players_repo.clear_team_links", lambda: repo.clear_team_links(ids[:10], "national_team_id"), repeat,
+        size=size, batch=10,
+    ))
+    db.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,50000,200000", help="размеры кэша игроков через запятую")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--only", choices=("parse", "sync", "repo"), action="append")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    logger.disable("hockey_squad_scraper")
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    suites = set(args.only or ("parse", "sync", "repo"))
+    fixtures = load_fixtures()
+
+    results: List[Dict[str, Any]] = []
+    if "parse" in suites:
+        results += bench_parsing(fixtures, args.repeat)
+    for size in sizes:
+        if "sync" in suites:
+            results += bench_process_team(fixtures, size, args.repeat)
+        if "repo" in suites:
+            results += bench_players_repo(size, args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "fixtures": sorted(fixtures),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
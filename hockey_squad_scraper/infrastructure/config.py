@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from dotenv import load_dotenv
 from typing import Tuple
 import os
+import socket
 
 load_dotenv()
 
@@ -13,15 +14,79 @@ class Settings:
     db_pass: str = os.getenv("DB_PASS")
     db_name: str = os.getenv("DB_NAME")
     db_ssl_ca: str | None = os.getenv("DB_SSL_CA")
+    db_replica_host: str | None = os.getenv("DB_REPLICA_HOST") or None
+    db_replica_port: int = int(os.getenv("DB_REPLICA_PORT") or os.getenv("DB_PORT") or 3306)
+    db_read_pool_size: int = int(os.getenv("DB_READ_POOL_SIZE", 2))
+    db_health_check_interval: int = int(os.getenv("DB_HEALTH_CHECK_INTERVAL", 30))
+
+    flashscore_base_url: str = os.getenv("FLASHSCORE_BASE_URL", "https://www.flashscore.com").rstrip("/")
+    proxy_file: str = os.getenv("PROXY_FILE", "")
 
     initial_delay_range: Tuple[int, int] = (
         int(os.getenv("INITIAL_DELAY_MIN")),
         int(os.getenv("INITIAL_DELAY_MAX")),
     )
-    request_delay: int = 1
+    host_rate: float = float(os.getenv("HOST_RATE", 0))
+    host_burst: float = float(os.getenv("HOST_BURST", 1))
+    proxy_rate: float = float(os.getenv("PROXY_RATE", 1.0))
+    proxy_burst: float = float(os.getenv("PROXY_BURST", 1))
     error_delay: int = 60
     main_loop_delay: int = 3600
     max_retries: int = 5
+    retry_after_max: int = int(os.getenv("RETRY_AFTER_MAX", 120))
+    fetch_workers: int = int(os.getenv("FETCH_WORKERS", 1))
+    http2: bool = os.getenv("HTTP2", "0") == "1"
+    extractor: str = os.getenv("EXTRACTOR", "soup")
+    parse_processes: int = int(os.getenv("PARSE_PROCESSES", 0))
+    proxy_failure_threshold: int = int(os.getenv("PROXY_FAILURE_THRESHOLD", 3))
+    proxy_quarantine: int = int(os.getenv("PROXY_QUARANTINE", 300))
+    countries_reload_interval: int = int(os.getenv("COUNTRIES_RELOAD_INTERVAL", 300))
+    country_aliases_file: str = os.getenv("COUNTRY_ALIASES_FILE", "")
+
+    state_dir: str = os.getenv("STATE_DIR", "state")
+    skip_unchanged: bool = os.getenv("SKIP_UNCHANGED", "1") == "1"
+    full_sync_every: int = int(os.getenv("FULL_SYNC_EVERY", 24))
+    archive_pages: bool = os.getenv("ARCHIVE_PAGES", "0") == "1"
+    archive_dir: str = os.getenv("ARCHIVE_DIR", "")
+    archive_segment_mb: int = int(os.getenv("ARCHIVE_SEGMENT_MB", 64))
+
+    scheduler: str = os.getenv("SCHEDULER", "sweep")
+    scheduler_tick: int = int(os.getenv("SCHEDULER_TICK", 60))
+    scheduler_min_interval: int = int(os.getenv("SCHEDULER_MIN_INTERVAL", 900))
+    scheduler_max_interval: int = int(os.getenv("SCHEDULER_MAX_INTERVAL", 86400))
+    scheduler_national_boost: float = float(os.getenv("SCHEDULER_NATIONAL_BOOST", 1.0))
+    scheduler_competition_boost: float = float(os.getenv("SCHEDULER_COMPETITION_BOOST", 1.0))
+    scheduler_boost_competitions: Tuple[int, ...] = tuple(
+        int(x) for x in os.getenv("SCHEDULER_BOOST_COMPETITIONS", "").split(",") if x.strip()
+    )
+
+    worker_id: str = os.getenv("WORKER_ID") or socket.gethostname()
+    # WORKER_ID задан явно, а не взят по умолчанию из имени хоста
+    worker_id_explicit: bool = bool(os.getenv("WORKER_ID"))
+    sharding: bool = os.getenv("SHARDING", "0") == "1"
+    lease_ttl: int = int(os.getenv("LEASE_TTL", 600))
+    lease_cooldown: int = int(os.getenv("LEASE_COOLDOWN", 3000))
+    lease_batch: int = int(os.getenv("LEASE_BATCH", 0))
+
+    metrics_port: int = int(os.getenv("METRICS_PORT", 0))
+    metrics_addr: str = os.getenv("METRICS_ADDR", "127.0.0.1")
+
+    journal_enabled: bool = os.getenv("JOURNAL_ENABLED", "0") == "1"
+
+    checkpoints: bool = os.getenv("CHECKPOINTS", "0") == "1"
+    checkpoint_max_age: int = int(os.getenv("CHECKPOINT_MAX_AGE", 21600))
+
+    profile_cycle: bool = os.getenv("PROFILE_CYCLE", "0") == "1"
+    profile_teams: Tuple[int, ...] = tuple(
+        int(x) for x in os.getenv("PROFILE_TEAMS", "").split(",") if x.strip()
+    )
+    profile_top: int = int(os.getenv("PROFILE_TOP", 30))
+
+    cache_write_through: bool = os.getenv("CACHE_WRITE_THROUGH", "1") == "1"
+    cache_reload_every: int = int(os.getenv("CACHE_RELOAD_EVERY", 24))
+    cache_delta_refresh: str = os.getenv("CACHE_DELTA_REFRESH", "cycle")
+    cache_snapshot: bool = os.getenv("CACHE_SNAPSHOT", "1") == "1"
+    cache_snapshot_max_age: int = int(os.getenv("CACHE_SNAPSHOT_MAX_AGE", 86400))
 
 
 
@@ -1,41 +1,204 @@
+import queue
+import threading
+import time
 import pymysql.cursors
 from contextlib import contextmanager
-from typing import Iterator, Any
+from typing import Iterator, Any, Dict, List
 from hockey_squad_scraper.infrastructure.config import Settings
+from hockey_squad_scraper.infrastructure.logger import logger
 
-class DB:
-    def __init__(self, cfg: Settings):
-        self.cfg = cfg
+
+class Connection:
+    """
+    Одно соединение с собственным DictCursor.
+
+    Перед выдачей курсора соединение проверяется ping-ом, если простаивало
+    дольше health_check_interval секунд или последняя транзакция упала;
+    внутри открытой транзакции проверка не выполняется.
+    """
+
+    def __init__(self, params: Dict[str, Any], *, autocommit: bool, health_check_interval: float):
+        self.params = params
+        self.autocommit = autocommit
+        self.health_check_interval = health_check_interval
+        self._in_transaction = False
         self._connect()
 
     def _connect(self) -> None:
         self.conn = pymysql.connect(
-            host=self.cfg.db_host,
-            port=self.cfg.db_port,
-            user=self.cfg.db_user,
-            passwd=self.cfg.db_pass,
-            db=self.cfg.db_name,
-            ssl_ca=self.cfg.db_ssl_ca,
+            **self.params,
             cursorclass=pymysql.cursors.DictCursor,
-            autocommit=False,
+            autocommit=self.autocommit,
         )
-        self.cur = self.conn.cursor()
+        self._cur = self.conn.cursor()
+        self._last_used = time.monotonic()
 
-    def reconnect(self) -> None:
+    @property
+    def cur(self) -> Any:
+        if not self._in_transaction:
+            self.check()
+        self._last_used = time.monotonic()
+        return self._cur
+
+    def check(self) -> None:
+        """Проверяет соединение, если оно простаивало или помечено сбойным, и переподключается."""
+        if time.monotonic() - self._last_used < self.health_check_interval:
+            return
         try:
             self.conn.ping(reconnect=True)
-        except Exception:
+        except Exception as exc:
+            logger.warning("DB {} ping failed ({}) — reconnecting", self.params.get("host"), exc)
+            self._close_quietly()
             self._connect()
+        self._last_used = time.monotonic()
+
+    def stream_cursor(self) -> Any:
+        """Новый небуферизованный курсор (строки-кортежи); его нужно дочитать или закрыть."""
+        self.check()
+        self._last_used = time.monotonic()
+        return self.conn.cursor(pymysql.cursors.SSCursor)
 
     @contextmanager
     def transaction(self) -> Iterator[Any]:
+        cur = self.cur
+        self._in_transaction = True
         try:
-            yield self.cur
+            yield cur
             self.conn.commit()
         except Exception:
-            self.conn.rollback()
+            # Следующая выдача курсора проверит соединение
+            self._last_used = float("-inf")
+            try:
+                self.conn.rollback()
+            except Exception as exc:
+                logger.warning("DB rollback failed: {}", exc)
             raise
+        finally:
+            self._in_transaction = False
+
+    def _close_quietly(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
 
     def close(self) -> None:
-        self.cur.close()
+        self._cur.close()
         self.conn.close()
+
+
+class ConnectionPool:
+    """
+    Пул соединений к одному хосту: до size соединений создаются по мере
+    надобности, при исчерпании acquire() ждёт освобождения.
+    """
+
+    def __init__(self, params: Dict[str, Any], size: int, *, autocommit: bool, health_check_interval: float):
+        self.params = params
+        self.size = max(1, size)
+        self.autocommit = autocommit
+        self.health_check_interval = health_check_interval
+        self._idle: "queue.LifoQueue[Connection]" = queue.LifoQueue()
+        self._all: List[Connection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Connection]:
+        connection = self._take()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def _take(self) -> Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                connection = Connection(
+                    self.params, autocommit=self.autocommit, health_check_interval=self.health_check_interval
+                )
+                self._all.append(connection)
+                return connection
+        return self._idle.get()
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._all:
+                connection.close()
+            self._all.clear()
+
+
+class DB:
+    """
+    Основное соединение для записи (primary) и пул соединений для чтения.
+
+    conn/cur/transaction() относятся к основному соединению, read() и stream()
+    выдают курсоры из пула чтения с autocommit — для массовых загрузок кэшей.
+    При DB_REPLICA_HOST пул чтения смотрит на реплику.
+    """
+
+    def __init__(self, cfg: Settings):
+        self.cfg = cfg
+        params = dict(
+            host=cfg.db_host,
+            port=cfg.db_port,
+            user=cfg.db_user,
+            passwd=cfg.db_pass,
+            db=cfg.db_name,
+            ssl_ca=cfg.db_ssl_ca,
+        )
+        self.primary = Connection(params, autocommit=False, health_check_interval=cfg.db_health_check_interval)
+        read_params = dict(params)
+        if cfg.db_replica_host:
+            read_params.update(host=cfg.db_replica_host, port=cfg.db_replica_port)
+        self.read_pool = ConnectionPool(
+            read_params,
+            cfg.db_read_pool_size,
+            autocommit=True,
+            health_check_interval=cfg.db_health_check_interval,
+        )
+
+    def dedicated(self) -> Connection:
+        """Отдельное autocommit-соединение с основным сервером — для фоновых потоков."""
+        return Connection(
+            self.primary.params, autocommit=True, health_check_interval=self.cfg.db_health_check_interval
+        )
+
+    @property
+    def conn(self) -> Any:
+        return self.primary.conn
+
+    @property
+    def cur(self) -> Any:
+        return self.primary.cur
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        with self.primary.transaction() as cur:
+            yield cur
+
+    @contextmanager
+    def read(self) -> Iterator[Any]:
+        """Курсор соединения из пула чтения."""
+        with self.read_pool.acquire() as connection:
+            yield connection.cur
+
+    @contextmanager
+    def stream(self) -> Iterator[Any]:
+        """
+        Небуферизованный курсор из пула чтения: строки (кортежи) читаются
+        с сервера по мере итерации, без материализации всего результата.
+        """
+        with self.read_pool.acquire() as connection:
+            cur = connection.stream_cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    def close(self) -> None:
+        self.read_pool.close()
+        self.primary.close()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from hockey_squad_scraper.infrastructure.logger import logger
+
+
+class FingerprintStore:
+    """Хранит отпечатки последних успешно синхронизированных составов в JSON-файле."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._data: Dict[str, str] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self._data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as exc:
+            logger.warning("Fingerprints file {} unreadable ({}) – starting empty", self.path, exc)
+            self._data = {}
+
+    def get(self, team_id: int) -> Optional[str]:
+        return self._data.get(str(team_id))
+
+    def set(self, team_id: int, fingerprint: Optional[str]) -> None:
+        if fingerprint is None:
+            self.discard(team_id)
+        elif self._data.get(str(team_id)) != fingerprint:
+            self._data[str(team_id)] = fingerprint
+            self._dirty = True
+
+    def discard(self, team_id: int) -> None:
+        if self._data.pop(str(team_id), None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Атомарно сохраняет отпечатки на диск, если они менялись."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self._data))
+        os.replace(tmp, self.path)
+        self._dirty = False
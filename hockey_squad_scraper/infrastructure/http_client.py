@@ -1,19 +1,57 @@
 import random
+import threading
 import time
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
 
 import requests
-from requests.exceptions import ProxyError, ConnectTimeout, SSLError, HTTPError, ReadTimeout
+from requests.exceptions import (
+    ChunkedEncodingError,
+    ConnectionError,
+    ConnectTimeout,
+    HTTPError,
+    ProxyError,
+    ReadTimeout,
+    SSLError,
+)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
 
 from hockey_squad_scraper.infrastructure.config import Settings
-from hockey_squad_scraper.infrastructure.proxies import ProxyPool
+from hockey_squad_scraper.infrastructure.proxies import PROXY_FILE, ProxyPool
+from hockey_squad_scraper.infrastructure.page_archive import PageArchive
+from hockey_squad_scraper.infrastructure.rate_limiter import RateLimiter
 from hockey_squad_scraper.infrastructure.logger import logger
+from hockey_squad_scraper.infrastructure.metrics import (
+    FETCH_RETRIES,
+    FETCH_SECONDS,
+    PROXY_FAILURES,
+    PROXY_ROTATIONS,
+    RATE_LIMIT_WAIT,
+)
 
 
 FL_WEB_HEADERS = {
     'accept':
         'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,'
         'image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'accept-encoding': ACCEPT_ENCODING,
     'accept-language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7,es;q=0.6',
     'cache-control': 'no-cache',
     'pragma': 'no-cache',
@@ -32,11 +70,113 @@ FL_WEB_HEADERS = {
         'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36',
 }
 
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    ProxyError, ConnectTimeout, SSLError, ReadTimeout, ConnectionError, ChunkedEncodingError,
+)
+if httpx is not None:
+    RETRYABLE_ERRORS += (httpx.TransportError,)
+
+TRANSPORT = "transport"
+RATE_LIMITED = "rate_limited"
+SERVER = "server"
+PERMANENT = "permanent"
+
+# Постоянные ответы, после которых прокси штрафуется и сменяется (блокировка IP)
+BLOCKED_STATUSES = frozenset({403})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Поведение при ошибке одного класса: пауза перед повтором — случайная
+    в [0, min(cap, base * 2^n)], где n — число предыдущих ошибок этого
+    класса в запросе; rotate — сменить прокси, penalize — засчитать
+    ошибку прокси в ProxyPool, defer — вместо ожидания отложить прокси в
+    ProxyPool на эту паузу (или Retry-After) и сразу повторить через другой.
+    """
+
+    base: float
+    cap: float
+    rotate: bool
+    penalize: bool
+    defer: bool = False
+
+
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    # Прокси не отвечает или рвёт соединение: сразу другой прокси, пауза короткая
+    TRANSPORT: RetryPolicy(base=0.5, cap=8, rotate=True, penalize=True),
+    # 429/503: ограничение по IP — прокси откладывается на паузу (или Retry-After), повтор сразу через другой
+    RATE_LIMITED: RetryPolicy(base=5, cap=120, rotate=True, penalize=False, defer=True),
+    # Прочие 5xx и 408: проблема сайта, прокси ни при чём
+    SERVER: RetryPolicy(base=2, cap=30, rotate=False, penalize=False),
+}
+
+
+class PermanentFetchError(RuntimeError):
+    """Ответ, который повтор не исправит (4xx, кроме 408 и 429), — например, удалённая команда."""
+
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"GET {url!r} failed permanently with {status}")
+        self.url = url
+        self.status = status
+
+
+def classify_status(status: int) -> str:
+    """Класс ошибочного HTTP-статуса."""
+    if status in (429, 503):
+        return RATE_LIMITED
+    if status == 408 or status >= 500:
+        return SERVER
+    return PERMANENT
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After в секундах (число секунд или HTTP-дата); None — заголовка нет или он некорректен."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
 
 class HttpClient:
-    def __init__(self, cfg: Settings, proxy_pool: Optional[ProxyPool] = None) -> None:
+    """
+    Загружает страницы через прокси из ProxyPool.
+
+    Каждый поток держит свою keep-alive сессию к текущему прокси и
+    переиспользует соединения между запросами; при смене прокси сессия
+    пересоздаётся. При HTTP2=1 и установленном httpx[http2] используется
+    HTTP/2-клиент. Если передан archive, страницы, запрошенные с team_id,
+    сохраняются в архив. Частоту запросов ограничивает RateLimiter: общее
+    ведро токенов на хост и по ведру на прокси.
+    """
+
+    def __init__(
+        self,
+        cfg: Settings,
+        proxy_pool: Optional[ProxyPool] = None,
+        archive: Optional[PageArchive] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
         self.cfg = cfg
-        self.pool = proxy_pool or ProxyPool()
+        self.archive = archive
+        self.limiter = rate_limiter or RateLimiter.from_settings(cfg)
+        self.pool = proxy_pool or ProxyPool(
+            cfg.proxy_file or PROXY_FILE,
+            failure_threshold=cfg.proxy_failure_threshold,
+            quarantine=cfg.proxy_quarantine,
+        )
+        self._local = threading.local()
+        # Прокси, выданные потокам клиента: освобождаются в close()
+        self._leased: Dict[int, dict[str, str]] = {}
+        self.http2 = cfg.http2 and self._http2_available()
         self.proxies = self.pool.next()
         delay = random.randint(*self.cfg.initial_delay_range)
         io, hi = self.cfg.initial_delay_range
@@ -45,36 +185,162 @@ class HttpClient:
         logger.info("Proxy ON, initial delay {}s", delay)
         time.sleep(delay)
 
+    @property
+    def proxies(self) -> dict[str, str]:
+        """Текущий прокси потока: параллельные загрузки идут через разные прокси."""
+        if getattr(self._local, "proxies", None) is None:
+            # Запись под тем же id потока осталась от завершившегося потока
+            stale = self._leased.pop(threading.get_ident(), None)
+            self.proxies = self.pool.next(current=stale)
+        return self._local.proxies
+
+    @proxies.setter
+    def proxies(self, value: dict[str, str]) -> None:
+        self._local.proxies = value
+        self._leased[threading.get_ident()] = value
+
+    def close(self) -> None:
+        """Возвращает в пул прокси всех потоков клиента и закрывает сессию текущего."""
+        for proxies in list(self._leased.values()):
+            self.pool.release(proxies)
+        self._leased.clear()
+        self._local.proxies = None
+        self._close_session()
+
+    @staticmethod
+    def _http2_available() -> bool:
+        if httpx is None:
+            logger.warning("HTTP2=1, но httpx не установлен — используется requests")
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP2=1, но пакет h2 не установлен — используется requests")
+            return False
+        return True
+
+    @property
+    def session(self) -> Any:
+        """Keep-alive сессия потока, привязанная к его текущему прокси."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._new_session(self.proxies)
+        return session
+
+    def _new_session(self, proxies: dict[str, str]) -> Any:
+        if self.http2:
+            return httpx.Client(
+                http2=True,
+                proxy=proxies["https"],
+                headers=FL_WEB_HEADERS,
+                follow_redirects=True,
+            )
+        session = requests.Session()
+        # Иначе HTTP(S)_PROXY из окружения перекрывают прокси сессии и запросы идут мимо ProxyPool
+        session.trust_env = False
+        session.headers.update(FL_WEB_HEADERS)
+        session.proxies.update(proxies)
+        return session
+
+    def _close_session(self) -> None:
+        session = getattr(self._local, "session", None)
+        self._local.session = None
+        if session is not None:
+            session.close()
+
     def _rotate_proxy(self) -> None:
-        self.proxies = self.pool.next()
+        self._close_session()
+        self.proxies = self.pool.next(current=self.proxies)
+        PROXY_ROTATIONS.inc()
         logger.info("Switched proxy → {}", self.proxies["http"])
 
-    def get(self, url: str, *, timeout: int = 30) -> str:
+    def _archive_page(self, team_id: int, url: str, html: str) -> None:
+        try:
+            self.archive.append(team_id, url, html)
+        except OSError as exc:
+            logger.warning("Page archive write failed for team {}: {}", team_id, exc)
+
+    def get(self, url: str, *, timeout: int = 30, team_id: Optional[int] = None) -> str:
+        """
+        Загружает страницу. Ошибки делятся на классы (RETRY_POLICIES), у
+        каждого своя пауза и смена прокси; на постоянные 4xx сразу
+        поднимается PermanentFetchError. Если все прокси отложены после
+        429/503, запрос ждёт ближайший из них, а ожидание (или Retry-After)
+        длиннее retry_after_max прекращает попытки.
+        """
         last_exc: Exception | None = None
-        attempts_left = self.cfg.max_retries
+        failures: Dict[str, int] = {}
+        attempt = 0
 
-        while attempts_left:
-            logger.debug("GET {} via {} (timeout={}s)", url, self.proxies["http"], timeout)
+        for attempt in range(1, self.cfg.max_retries + 1):
+            proxies = self.proxies
+            cooldown = self.pool.wait_time(proxies)
+            if cooldown > 0:
+                if cooldown > self.cfg.retry_after_max:
+                    logger.warning("All proxies rate limited for {:.0f}s more — giving up on {}", cooldown, url)
+                    break
+                time.sleep(cooldown)
+            logger.debug("GET {} via {} (timeout={}s)", url, proxies["http"], timeout)
+            waited = self.limiter.acquire(urlsplit(url).netloc, proxies["http"])
+            if waited:
+                RATE_LIMIT_WAIT.inc(waited)
+            retry_after = None
+            started = time.monotonic()
             try:
-                resp = requests.get(
-                    url,
-                    timeout=timeout,
-                    headers=FL_WEB_HEADERS,
-                    proxies=self.proxies,
-                )
-                resp.raise_for_status()
-                logger.info("{} {}", url, resp.status_code)
-                time.sleep(self.cfg.request_delay)
-                return resp.text
-
-            except (ProxyError, ConnectTimeout, SSLError, HTTPError, ReadTimeout) as exc:
+                resp = self.session.get(url, timeout=timeout)
+            except RETRYABLE_ERRORS as exc:
+                kind = TRANSPORT
                 last_exc = exc
+                FETCH_SECONDS.observe(time.monotonic() - started, result=kind)
+                PROXY_FAILURES.inc(error=type(exc).__name__)
                 logger.warning("Proxy failed: {} → rotating", exc)
+            else:
+                elapsed = time.monotonic() - started
+                if resp.status_code < 400:
+                    self.pool.report_success(proxies, elapsed)
+                    FETCH_SECONDS.observe(elapsed, result="ok")
+                    logger.info("{} {}", url, resp.status_code)
+                    html = resp.text
+                    if self.archive is not None and team_id is not None:
+                        self._archive_page(team_id, url, html)
+                    return html
+
+                kind = classify_status(resp.status_code)
+                FETCH_SECONDS.observe(elapsed, result=kind)
+                if kind == PERMANENT:
+                    # Повтор ответа не изменит; 403 обычно значит, что IP прокси заблокирован
+                    if resp.status_code in BLOCKED_STATUSES:
+                        self.pool.report_failure(proxies)
+                        self._rotate_proxy()
+                    raise PermanentFetchError(url, resp.status_code)
+                last_exc = HTTPError(f"{resp.status_code} Error for url: {url}", response=resp)
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                logger.warning("{} {} ({})", url, resp.status_code, kind)
+
+            policy = RETRY_POLICIES[kind]
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, 1)
+            else:
+                n = failures.get(kind, 0)
+                delay = random.uniform(0, min(policy.cap, policy.base * 2 ** n))
+            if policy.penalize:
+                self.pool.report_failure(proxies)
+            if policy.defer:
+                self.pool.defer(proxies, delay)
+            if policy.rotate:
                 self._rotate_proxy()
-                attempts_left -= 1
-                time.sleep(1)
+            if attempt == self.cfg.max_retries:
+                break
 
-        logger.opt(exception=last_exc).exception(
-            "GET {} aborted after {} retries", url, self.cfg.max_retries
-        )
+            if not policy.defer and retry_after is not None and retry_after > self.cfg.retry_after_max:
+                logger.warning("Retry-After {:.0f}s for {} exceeds limit — giving up", retry_after, url)
+                break
+            failures[kind] = failures.get(kind, 0) + 1
+            FETCH_RETRIES.inc(reason=kind)
+            if not policy.defer:
+                time.sleep(delay)
+
+        # Трассировка есть только у пойманных исключений, не у ошибочных ответов
+        log = logger.opt(exception=last_exc) if getattr(last_exc, "__traceback__", None) else logger
+        log.error("GET {} aborted after {} attempts: {}", url, attempt, last_exc)
         raise RuntimeError(f"GET {url!r} failed") from last_exc
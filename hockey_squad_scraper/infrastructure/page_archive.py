@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import bisect
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from hockey_squad_scraper.infrastructure.logger import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_MAGIC = b"HSP1"
+# magic, team_id, timestamp, длина url, длина сжатой страницы
+_HEADER = struct.Struct("<4sIdHI")
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """Положение одной сохранённой страницы в архиве."""
+
+    team_id: int
+    ts: float
+    segment: str
+    offset: int
+    url: str
+
+
+class PageArchive:
+    """
+    Архив загруженных страниц составов: append-only сегменты с записями
+    «заголовок + url + страница в zlib» и текстовый индекс team_id → (время,
+    сегмент, смещение). Сегмент закрывается по достижении segment_size байт.
+
+    Индекс дописывается после записи страницы; если его нет или он отстал
+    от сегментов (например, после падения), rebuild_index() восстанавливает
+    его по заголовкам записей.
+
+    В один каталог могут писать несколько процессов: запись страницы и
+    строки индекса идёт под flock на файле .lock, смещение берётся из
+    размера сегмента под той же блокировкой. В памяти экземпляра — только
+    индекс на момент открытия и его собственные записи.
+    """
+
+    INDEX = "index.tsv"
+    LOCK = ".lock"
+
+    def __init__(self, directory: Path | str, *, segment_size: int = 64 * 1024 * 1024, level: int = 6) -> None:
+        self.dir = Path(directory)
+        self.segment_size = segment_size
+        self.level = level
+        self._lock = threading.Lock()
+        self._entries: Dict[int, List[ArchiveEntry]] = {}
+        self._segment: Optional[BinaryIO] = None
+        self._segment_name = ""
+        self._index: Optional[BinaryIO] = None
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock_file = (self.dir / self.LOCK).open("ab")
+        with self._locked():
+            self._load_index()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Межпроцессная блокировка каталога (без fcntl — только внутри процесса)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.dir.glob("pages-*.seg"))
+
+    def _load_index(self) -> None:
+        path = self.dir / self.INDEX
+        if not path.exists():
+            if self._segments():
+                self._rebuild_index()
+            return
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t", 4)
+                if len(parts) != 5:
+                    continue
+                team_id, ts, segment, offset, url = parts
+                self._add(ArchiveEntry(int(team_id), float(ts), segment, int(offset), url))
+
+    def _add(self, entry: ArchiveEntry) -> None:
+        entries = self._entries.setdefault(entry.team_id, [])
+        if entries and entries[-1].ts > entry.ts:
+            bisect.insort(entries, entry, key=lambda e: e.ts)
+        else:
+            entries.append(entry)
+
+    def rebuild_index(self) -> None:
+        """Пересобирает индекс по заголовкам записей всех сегментов."""
+        with self._locked():
+            self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self._close_files()
+        self._entries = {}
+        lines = []
+        for path in self._segments():
+            for entry in self._scan(path):
+                self._add(entry)
+                lines.append(self._index_line(entry))
+        tmp = self.dir / (self.INDEX + ".tmp")
+        tmp.write_bytes(b"".join(lines))
+        tmp.replace(self.dir / self.INDEX)
+        logger.info("Page archive index rebuilt: {} pages of {} teams", len(lines), len(self._entries))
+
+    def _scan(self, path: Path) -> Iterator[ArchiveEntry]:
+        with path.open("rb") as f:
+            offset = 0
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                magic, team_id, ts, url_len, data_len = _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    logger.warning("Page archive {} corrupted at offset {} – rest skipped", path.name, offset)
+                    return
+                url = f.read(url_len).decode()
+                f.seek(data_len, 1)
+                yield ArchiveEntry(team_id, ts, path.name, offset, url)
+                offset += _HEADER.size + url_len + data_len
+
+    @staticmethod
+    def _index_line(entry: ArchiveEntry) -> bytes:
+        return f"{entry.team_id}\t{entry.ts:.3f}\t{entry.segment}\t{entry.offset}\t{entry.url}\n".encode()
+
+    def append(self, team_id: int, url: str, html: str, ts: Optional[float] = None) -> ArchiveEntry:
+        """Сжимает и дописывает страницу команды в текущий сегмент."""
+        ts = time.time() if ts is None else ts
+        url_bytes = url.encode()
+        data = zlib.compress(html.encode("utf-8"), self.level)
+        record = _HEADER.pack(_MAGIC, team_id, ts, len(url_bytes), len(data)) + url_bytes + data
+        with self._locked():
+            segment = self._writable_segment()
+            # Другие процессы тоже дописывают сегмент: его конец — только по fstat под блокировкой
+            offset = os.fstat(segment.fileno()).st_size
+            segment.write(record)
+            segment.flush()
+            entry = ArchiveEntry(team_id, ts, self._segment_name, offset, url)
+            index = self._index_file()
+            index.write(self._index_line(entry))
+            index.flush()
+            self._add(entry)
+        return entry
+
+    @staticmethod
+    def _segment_file(number: int) -> str:
+        return f"pages-{number:06d}.seg"
+
+    def _writable_segment(self) -> BinaryIO:
+        """Последний сегмент каталога, если он не заполнен, иначе новый (вызывается под блокировкой)."""
+        if self._segment is None:
+            segments = self._segments()
+            number = int(segments[-1].stem.split("-")[1]) if segments else 1
+        else:
+            number = int(self._segment_name[len("pages-"):-len(".seg")])
+        # Следующий сегмент мог начать другой процесс
+        while (self.dir / self._segment_file(number + 1)).exists():
+            number += 1
+        path = self.dir / self._segment_file(number)
+        if path.exists() and path.stat().st_size >= self.segment_size:
+            number += 1
+            path = self.dir / self._segment_file(number)
+        if self._segment is None or path.name != self._segment_name:
+            if self._segment is not None:
+                self._segment.close()
+            self._segment_name = path.name
+            self._segment = path.open("ab")
+        return self._segment
+
+    def _index_file(self) -> BinaryIO:
+        # Индекс мог быть заменён rebuild_index() другого процесса
+        if self._index is not None and os.fstat(self._index.fileno()).st_ino != self._index_inode():
+            self._index.close()
+            self._index = None
+        if self._index is None:
+            self._index = (self.dir / self.INDEX).open("ab")
+        return self._index
+
+    def _index_inode(self) -> Optional[int]:
+        try:
+            return (self.dir / self.INDEX).stat().st_ino
+        except FileNotFoundError:
+            return None
+
+    def team_ids(self) -> List[int]:
+        return sorted(self._entries)
+
+    def history(self, team_id: int) -> List[ArchiveEntry]:
+        """Все сохранённые страницы команды по возрастанию времени."""
+        return list(self._entries.get(team_id, ()))
+
+    def latest(self, team_id: int, until: Optional[float] = None) -> Optional[ArchiveEntry]:
+        """Последняя страница команды, сохранённая не позже until (None — самая свежая)."""
+        entries = self._entries.get(team_id)
+        if not entries:
+            return None
+        if until is None:
+            return entries[-1]
+        i = bisect.bisect_right(entries, until, key=lambda e: e.ts)
+        return entries[i - 1] if i else None
+
+    def read(self, entry: ArchiveEntry) -> str:
+        """Читает и распаковывает страницу."""
+        with (self.dir / entry.segment).open("rb") as f:
+            f.seek(entry.offset)
+            magic, _, _, url_len, data_len = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Повреждённая запись архива {entry.segment}:{entry.offset}")
+            f.seek(url_len, 1)
+            return zlib.decompress(f.read(data_len)).decode("utf-8")
+
+    def _close_files(self) -> None:
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+        self._segment = None
+        self._index = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_files()
+            self._lock_file.close()
+
+
+class ReplayHttpClient:
+    """
+    Замена HttpClient для офлайн-повтора: на запрос страницы команды отдаёт
+    её последнюю сохранённую в архиве версию (не позже until), без сети.
+    """
+
+    def __init__(self, archive: PageArchive, until: Optional[float] = None) -> None:
+        self.archive = archive
+        self.until = until
+
+    def get(self, url: str, *, team_id: Optional[int] = None, **_) -> str:
+        entry = self.archive.latest(team_id, self.until) if team_id is not None else None
+        if entry is None:
+            raise LookupError(f"В архиве нет страницы для {url!r}")
+        return self.archive.read(entry)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import signal
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Iterable, Iterator, Set
+
+from hockey_squad_scraper.infrastructure.logger import logger
+
+
+class Profiler:
+    """
+    Разовое профилирование цикла или отдельной команды через cProfile.
+
+    Цикл профилируется, если это запрошено флагом PROFILE_CYCLE или сигналом
+    (по умолчанию SIGUSR1); команды из PROFILE_TEAMS — при их ближайшей
+    обработке (целиком в пишущем потоке). Дамп pstats пишется в out_dir (его понимают snakeviz,
+    flameprof, gprof2dot), top-N функций по cumulative — в лог.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path | str,
+        *,
+        top_n: int = 30,
+        profile_next_cycle: bool = False,
+        team_ids: Iterable[int] = (),
+    ) -> None:
+        self.out_dir = Path(out_dir)
+        self.top_n = top_n
+        self.cycle_requested = profile_next_cycle
+        self.team_ids: Set[int] = set(team_ids)
+
+    def install_signal(self, signum: int = getattr(signal, "SIGUSR1", 0)) -> None:
+        """Включает профилирование следующего цикла по сигналу."""
+        if not signum:
+            return
+
+        def handler(_signum, _frame) -> None:
+            self.cycle_requested = True
+            logger.info("Profiling of the next cycle requested by signal {}", _signum)
+
+        signal.signal(signum, handler)
+
+    def request_team(self, team_id: int) -> None:
+        self.team_ids.add(team_id)
+
+    def wants_team(self, team_id: int) -> bool:
+        return team_id in self.team_ids
+
+    def cycle(self, label: str = "cycle") -> ContextManager[None]:
+        """Профилирует блок, если профилирование цикла запрошено (флаг сбрасывается)."""
+        if not self.cycle_requested:
+            return nullcontext()
+        self.cycle_requested = False
+        return self.profile(label)
+
+    def team(self, team_id: int) -> ContextManager[None]:
+        """Профилирует обработку команды, если она запрошена (один раз)."""
+        if team_id not in self.team_ids:
+            return nullcontext()
+        self.team_ids.discard(team_id)
+        return self.profile(f"team-{team_id}")
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._report(profiler, label, time.perf_counter() - started)
+
+    def _report(self, profiler: cProfile.Profile, label: str, elapsed: float) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"{label}-{time.strftime('%Y%m%d-%H%M%S')}.pstats"
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(self.top_n)
+        logger.info("Profile of {} ({:.1f}s) saved to {}\n{}", label, elapsed, path, summary.getvalue())
@@ -1,6 +1,11 @@
 import random
+import threading
+import time
+from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+from hockey_squad_scraper.infrastructure.logger import logger
 
 PROXY_FILE = Path(__file__).resolve().parents[1] / "proxies.txt"
 
@@ -12,22 +17,192 @@ def _parse(proxy_raw: str) -> dict[str, str]:
     return {"http": url, "https": url}
 
 
+def _display(proxy_url: str) -> str:
+    """host:port без учётных данных — для логов и статистики."""
+    return proxy_url.rsplit("@", 1)[-1]
+
+
+@dataclass
+class ProxyStats:
+    """Накопленная статистика одного прокси."""
+
+    proxy: str
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ewma_latency: Optional[float] = None
+    quarantined_until: float = 0.0
+    # До этого момента (time.monotonic) прокси не выдаётся: сайт ответил ему 429/503
+    not_before: float = 0.0
+    in_use: int = 0
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        total = self.successes + self.failures
+        return self.successes / total if total else None
+
+    def quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+    def available_at(self) -> float:
+        return max(self.quarantined_until, self.not_before)
+
+
 class ProxyPool:
-    """Достаёт случайный прокси из файла и умеет выдавать следующий при ошибке."""
+    """
+    Выдаёт прокси из файла с учётом их здоровья.
+
+    Для каждого прокси считаются успехи/ошибки и EWMA задержки. После
+    failure_threshold ошибок подряд прокси уходит в карантин на quarantine
+    секунд; по истечении карантина ему даётся одна пробная попытка, и новая
+    ошибка сразу возвращает его в карантин. Прокси, которому сайт ответил
+    429/503, не выдаётся до истечения Retry-After (defer), без штрафа. Из здоровых прокси выбирается
+    случайный среди top_k наименее загруженных и самых быстрых; прокси без
+    замеров пробуются в первую очередь. Изменённый файл перечитывается при
+    следующей выдаче прокси.
+    """
 
-    def __init__(self, file_path: Path | str = PROXY_FILE) -> None:
+    def __init__(
+        self,
+        file_path: Path | str = PROXY_FILE,
+        *,
+        failure_threshold: int = 3,
+        quarantine: float = 300.0,
+        ewma_alpha: float = 0.3,
+        top_k: int = 3,
+    ) -> None:
         self.file_path = Path(file_path)
+        self.failure_threshold = failure_threshold
+        self.quarantine = quarantine
+        self.ewma_alpha = ewma_alpha
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ProxyStats] = {}
+        self._mtime: Optional[int] = None
         self._load()
 
     def _load(self) -> None:
+        mtime = self.file_path.stat().st_mtime_ns
         with self.file_path.open() as f:
             lines = [l.strip() for l in f if l.strip()]
         if not lines:
             raise RuntimeError(f"{self.file_path} пустой")
-        random.shuffle(lines)
-        self._pool: List[str] = lines
+        proxies = {_parse(line)["http"] for line in lines}
+        self._stats = {
+            proxy: self._stats.get(proxy) or ProxyStats(proxy)
+            for proxy in proxies
+        }
+        self._mtime = mtime
 
-    def next(self) -> dict[str, str]:
-        if not self._pool:
+    def _reload_if_changed(self) -> None:
+        """Перечитывает файл прокси, если он изменился, сохраняя статистику уже известных."""
+        try:
+            mtime: Optional[int] = self.file_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
             self._load()
-        return _parse(self._pool.pop())
+        except (OSError, RuntimeError, ValueError) as exc:
+            # Файл могут переписывать прямо сейчас: остаёмся на прежнем списке
+            logger.warning("Proxy file reload failed, keeping {} proxies: {}", len(self._stats), exc)
+            return
+        logger.info("Proxy file reloaded: {} proxies", len(self._stats))
+
+    def next(self, current: Optional[dict[str, str]] = None) -> dict[str, str]:
+        """Освобождает текущий прокси (если передан) и выдаёт лучший из здоровых."""
+        with self._lock:
+            if current is not None:
+                self._release(current)
+            self._reload_if_changed()
+            now = time.monotonic()
+            healthy = [s for s in self._stats.values() if s.available_at() <= now]
+            if healthy:
+                healthy.sort(key=lambda s: (
+                    s.in_use,
+                    -1.0 if s.ewma_latency is None else s.ewma_latency,
+                    random.random(),
+                ))
+                chosen = random.choice(healthy[:self.top_k])
+            else:
+                chosen = min(self._stats.values(), key=lambda s: s.available_at())
+            chosen.in_use += 1
+            return {"http": chosen.proxy, "https": chosen.proxy}
+
+    def release(self, proxies: dict[str, str]) -> None:
+        """Возвращает выданный прокси в пул (при остановке клиента)."""
+        with self._lock:
+            self._release(proxies)
+
+    def _release(self, proxies: dict[str, str]) -> None:
+        stats = self._stats.get(proxies["http"])
+        if stats is not None and stats.in_use:
+            stats.in_use -= 1
+
+    def defer(self, proxies: dict[str, str], delay: float) -> None:
+        """Не выдаёт прокси ближайшие delay секунд (Retry-After или пауза после 429/503)."""
+        with self._lock:
+            stats = self._stats.get(proxies["http"])
+            if stats is not None:
+                stats.not_before = max(stats.not_before, time.monotonic() + delay)
+
+    def wait_time(self, proxies: dict[str, str]) -> float:
+        """Сколько секунд осталось до момента, когда прокси снова можно использовать."""
+        with self._lock:
+            stats = self._stats.get(proxies["http"])
+            return max(0.0, stats.not_before - time.monotonic()) if stats is not None else 0.0
+
+    def report_success(self, proxies: dict[str, str], latency: float) -> None:
+        """Учитывает успешный запрос и его длительность в секундах."""
+        with self._lock:
+            stats = self._stats.get(proxies["http"])
+            if stats is None:
+                return
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.quarantined_until = 0.0
+            if stats.ewma_latency is None:
+                stats.ewma_latency = latency
+            else:
+                stats.ewma_latency += self.ewma_alpha * (latency - stats.ewma_latency)
+
+    def report_failure(self, proxies: dict[str, str]) -> None:
+        """Учитывает ошибку прокси; при серии ошибок отправляет его в карантин."""
+        with self._lock:
+            stats = self._stats.get(proxies["http"])
+            if stats is None:
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.failure_threshold:
+                stats.quarantined_until = time.monotonic() + self.quarantine
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Снимок статистики всех прокси, от самых быстрых к медленным."""
+        now = time.monotonic()
+        with self._lock:
+            rows = []
+            for s in self._stats.values():
+                row = asdict(s)
+                row["proxy"] = _display(s.proxy)
+                row["success_rate"] = s.success_rate
+                row["quarantined_for"] = max(0.0, s.quarantined_until - now)
+                row["deferred_for"] = max(0.0, s.not_before - now)
+                del row["quarantined_until"], row["not_before"]
+                rows.append(row)
+        rows.sort(key=lambda r: (r["quarantined_for"] > 0, r["ewma_latency"] is None, r["ewma_latency"] or 0))
+        return rows
+
+    def summary(self) -> str:
+        """Короткая сводка для лога: здоровые, в карантине, под ограничением сайта, лучшая задержка."""
+        rows = self.stats()
+        quarantined = sum(1 for r in rows if r["quarantined_for"] > 0)
+        deferred = sum(1 for r in rows if r["deferred_for"] > 0 and not r["quarantined_for"])
+        latencies = [r["ewma_latency"] for r in rows if r["ewma_latency"] is not None and not r["quarantined_for"]]
+        best = f"{min(latencies):.2f}s" if latencies else "n/a"
+        return (
+            f"healthy {len(rows) - quarantined}/{len(rows)}, quarantined {quarantined}, "
+            f"rate limited {deferred}, best latency {best}"
+        )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Ведро токенов: rate токенов в секунду, не больше burst в запасе.
+
+    reserve() сразу списывает токен (запас может уйти в минус) и возвращает,
+    сколько ждать до его появления, — так параллельные вызовы выстраиваются
+    в очередь без повторных попыток. rate <= 0 — без ограничения.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов: общее ведро на хост и по ведру на каждый
+    прокси. acquire() резервирует токен в обоих и ждёт дольшее из двух
+    ожиданий; безопасен для параллельных вызовов.
+    """
+
+    def __init__(
+        self,
+        host_rate: float,
+        host_burst: float,
+        proxy_rate: float,
+        proxy_burst: float,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.proxy_rate = proxy_rate
+        self.proxy_burst = proxy_burst
+        self._sleep = sleep
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._proxies: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, cfg) -> "RateLimiter":
+        return cls(
+            host_rate=cfg.host_rate,
+            host_burst=cfg.host_burst,
+            proxy_rate=cfg.proxy_rate,
+            proxy_burst=cfg.proxy_burst,
+        )
+
+    def _bucket(self, buckets: Dict[str, TokenBucket], key: str, rate: float, burst: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = buckets.setdefault(key, TokenBucket(rate, burst))
+        return bucket
+
+    def acquire(self, host: str, proxy: Optional[str] = None) -> float:
+        """Ждёт, пока запрос к host через proxy укладывается в лимиты; возвращает время ожидания."""
+        wait = self._bucket(self._hosts, host, self.host_rate, self.host_burst).reserve()
+        if proxy is not None:
+            wait = max(wait, self._bucket(self._proxies, proxy, self.proxy_rate, self.proxy_burst).reserve())
+        if wait > 0:
+            self._sleep(wait)
+        return wait
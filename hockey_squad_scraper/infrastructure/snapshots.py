@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from hockey_squad_scraper.infrastructure.logger import logger
+
+FORMAT = 1
+
+
+def save_snapshot(path: Path | str, key: str, payload: Dict[str, Any]) -> None:
+    """Атомарно сохраняет снимок кэша (pickle) с ключом источника и временем записи."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(
+            {"format": FORMAT, "key": key, "saved_at": time.time(), **payload},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path | str, key: str, max_age: float) -> Optional[Dict[str, Any]]:
+    """
+    Читает снимок кэша; None, если файла нет, он повреждён, снят с другого
+    источника (key) или старше max_age секунд.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as exc:
+        logger.warning("Snapshot {} unreadable ({}) – ignored", path, exc)
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != FORMAT or snapshot.get("key") != key:
+        logger.info("Snapshot {} is for another source or format – ignored", path)
+        return None
+    age = time.time() - snapshot["saved_at"]
+    if age > max_age:
+        logger.info("Snapshot {} is {:.0f}s old – ignored", path, age)
+        return None
+    return snapshot
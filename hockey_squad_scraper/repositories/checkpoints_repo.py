@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+from hockey_squad_scraper.infrastructure.db import DB
+from hockey_squad_scraper.infrastructure.logger import logger
+
+# Исход команды в цикле ↔ значение колонки outcome
+OUTCOMES = {True: "changed", False: "unchanged", None: "failed"}
+_OUTCOME_VALUES = {value: outcome for outcome, value in OUTCOMES.items()}
+
+
+class CheckpointsRepo:
+    """
+    Контрольные точки циклов: какие команды текущего цикла уже обработаны
+    и с каким исходом.
+
+    Отметка о команде пишется в той же транзакции, что и изменения её
+    состава, поэтому после падения процесса незавершённый цикл экземпляра
+    (worker) продолжается только с оставшимися командами. Цикл, начатый
+    больше max_age секунд назад, не продолжается — начинается новый.
+    """
+
+    DDL = (
+        """
+        CREATE TABLE IF NOT EXISTS hockey_scraper_cycles (
+            id          BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            worker      VARCHAR(128)    NOT NULL,
+            started_at  DATETIME        NOT NULL,
+            finished_at DATETIME        NULL,
+            teams       INT UNSIGNED    NOT NULL DEFAULT 0,
+            changed     INT UNSIGNED    NULL,
+            unchanged   INT UNSIGNED    NULL,
+            failed      INT UNSIGNED    NULL,
+            KEY idx_worker_finished (worker, finished_at)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS hockey_scraper_cycle_teams (
+            cycle_id BIGINT UNSIGNED NOT NULL,
+            team_id  INT UNSIGNED    NOT NULL,
+            outcome  VARCHAR(16)     NOT NULL,
+            done_at  DATETIME        NOT NULL,
+            PRIMARY KEY (cycle_id, team_id)
+        ) ENGINE=InnoDB
+        """,
+    )
+
+    def __init__(self, db: DB, worker: str, max_age: int):
+        self.db = db
+        self.worker = worker
+        self.max_age = max_age
+
+    def ensure_schema(self) -> None:
+        """Создаёт таблицы циклов, если их ещё нет."""
+        for ddl in self.DDL:
+            self.db.cur.execute(ddl)
+        self.db.conn.commit()
+
+    def start(self, teams: int) -> Tuple[int, Dict[int, Optional[bool]]]:
+        """
+        Продолжает незавершённый цикл экземпляра или начинает новый.
+        Возвращает id цикла и исходы уже обработанных в нём команд.
+        """
+        cur = self.db.cur
+        cur.execute(
+            """
+            SELECT id, started_at, NOW() AS now FROM hockey_scraper_cycles
+            WHERE worker = %s AND finished_at IS NULL
+            ORDER BY id DESC LIMIT 1
+            """,
+            (self.worker,),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            age = (row["now"] - row["started_at"]).total_seconds()
+            if age <= self.max_age:
+                cur.execute(
+                    "SELECT team_id, outcome FROM hockey_scraper_cycle_teams WHERE cycle_id = %s",
+                    (row["id"],),
+                )
+                done = {r["team_id"]: _OUTCOME_VALUES.get(r["outcome"]) for r in cur.fetchall()}
+                self.db.conn.commit()
+                return row["id"], done
+            logger.info("Cycle {} started {:.0f}s ago – abandoned, starting a new one", row["id"], age)
+            self.finish(row["id"])
+
+        cur.execute(
+            "INSERT INTO hockey_scraper_cycles (worker, started_at, teams) VALUES (%s, NOW(), %s)",
+            (self.worker, teams),
+        )
+        cycle_id = cur.lastrowid
+        self.db.conn.commit()
+        return cycle_id, {}
+
+    def record(self, cycle_id: int, team_id: int, outcome: Optional[bool]) -> None:
+        """Отмечает команду обработанной в цикле (без commit — в транзакции команды)."""
+        self.db.cur.execute(
+            """
+            REPLACE INTO hockey_scraper_cycle_teams (cycle_id, team_id, outcome, done_at)
+            VALUES (%s, %s, %s, NOW())
+            """,
+            (cycle_id, team_id, OUTCOMES[outcome]),
+        )
+
+    def finish(self, cycle_id: int) -> None:
+        """
+        Закрывает цикл, сохраняя в нём число команд по исходам, и удаляет
+        отметки команд более ранних циклов экземпляра.
+        """
+        cur = self.db.cur
+        cur.execute(
+            "SELECT outcome, COUNT(*) AS n FROM hockey_scraper_cycle_teams WHERE cycle_id = %s GROUP BY outcome",
+            (cycle_id,),
+        )
+        counts = {row["outcome"]: row["n"] for row in cur.fetchall()}
+        changed, unchanged, failed = (counts.get(OUTCOMES[o], 0) for o in (True, False, None))
+        cur.execute(
+            """
+            UPDATE hockey_scraper_cycles
+            SET finished_at = NOW(), changed = %s, unchanged = %s, failed = %s
+            WHERE id = %s
+            """,
+            (changed, unchanged, failed, cycle_id),
+        )
+        cur.execute(
+            """
+            DELETE FROM hockey_scraper_cycle_teams
+            WHERE cycle_id IN (SELECT id FROM hockey_scraper_cycles WHERE worker = %s AND id < %s)
+            """,
+            (self.worker, cycle_id),
+        )
+        self.db.conn.commit()
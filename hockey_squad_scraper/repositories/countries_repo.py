@@ -1,21 +1,157 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
 from hockey_squad_scraper.infrastructure.db import DB
+from hockey_squad_scraper.infrastructure.logger import logger
+
+
+# Группы равнозначных названий: совпадение с любым из них ищется по всем
+ALIAS_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    ("USA", "United States", "United States of America"),
+    ("Czech Republic", "Czechia"),
+    ("Slovakia", "Slovak Republic"),
+    ("Russia", "Russian Federation"),
+    ("South Korea", "Korea Republic", "Republic of Korea", "Korea, Republic of"),
+    ("North Korea", "Korea DPR", "DPR Korea"),
+    ("Great Britain", "United Kingdom"),
+    ("Netherlands", "Holland"),
+    ("Turkey", "Türkiye"),
+    ("Chinese Taipei", "Taiwan"),
+    ("Hong Kong", "Hong Kong, China"),
+    ("Bosnia and Herzegovina", "Bosnia & Herzegovina"),
+    ("Ivory Coast", "Côte d'Ivoire"),
+)
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_title(title: str) -> str:
+    """Ключ поиска: без диакритики, casefold, '&' → 'and', знаки препинания и пробелы схлопнуты."""
+    decomposed = unicodedata.normalize("NFKD", title)
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return _NON_WORD.sub(" ", folded.replace("&", " and ")).strip()
+
+
+def load_alias_file(path: Path | str) -> Tuple[Tuple[str, ...], ...]:
+    """Читает группы синонимов: одна группа на строку, названия через '|', '#' — комментарий."""
+    groups = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            names = tuple(name.strip() for name in line.split("|") if name.strip())
+            if len(names) > 1:
+                groups.append(names)
+    return tuple(groups)
 
 
 class CountriesRepo:
-    def __init__(self, db: DB):
+    """
+    Справочник стран: название флага → id страны.
+
+    Поиск идёт по нормализованному названию (регистр, диакритика,
+    пунктуация) и группам синонимов. Незнакомое название запускает
+    дочитывание новых строк `countries` не чаще раза в reload_interval
+    секунд; промахи запоминаются на тот же срок, чтобы не ходить в БД за
+    каждым игроком. get_id безопасен для вызова из потоков загрузки.
+    """
+
+    def __init__(
+        self,
+        db: DB,
+        aliases: Sequence[Sequence[str]] = ALIAS_GROUPS,
+        reload_interval: float = 300,
+    ):
         self.db = db
+        self.reload_interval = reload_interval
         self.map: Dict[str, int] = {}
+        self._index: Dict[str, int] = {}
+        self._aliases: Dict[str, Tuple[str, ...]] = {}
+        self._misses: Dict[str, float] = {}
+        self._max_id = 0
+        self._last_reload = 0.0
+        self._lock = threading.Lock()
+        self.set_aliases(aliases)
         self.refresh()
 
+    def set_aliases(self, groups: Iterable[Sequence[str]]) -> None:
+        """Задаёт группы синонимов (нормализованное название → все названия группы)."""
+        aliases: Dict[str, Tuple[str, ...]] = {}
+        for group in groups:
+            keys = tuple(dict.fromkeys(normalize_title(name) for name in group))
+            for key in keys:
+                aliases[key] = tuple(dict.fromkeys(aliases.get(key, ()) + keys))
+        self._aliases = aliases
+
     def refresh(self) -> None:
         """Обновитляет кэш стран из таблицы `countries`."""
         sql = "SELECT id, common_title FROM countries"
-        self.db.cur.execute(sql)
-        self.map = {row["common_title"]: row["id"] for row in self.db.cur.fetchall()}
+        with self.db.read() as cur:
+            cur.execute(sql)
+            rows = cur.fetchall()
+        with self._lock:
+            self.map = {row["common_title"]: row["id"] for row in rows}
+            self._index = {}
+            self._max_id = 0
+            self._add_rows(rows)
+            self._misses.clear()
+            self._last_reload = time.monotonic()
+
+    def _add_rows(self, rows: Iterable[Dict]) -> None:
+        index = dict(self._index)
+        for row in rows:
+            self.map[row["common_title"]] = row["id"]
+            index.setdefault(normalize_title(row["common_title"]), row["id"])
+            self._max_id = max(self._max_id, row["id"])
+        self._index = index
 
-    def get_id(self, title: str) -> Optional[int]:
+    def _resolve(self, key: str) -> Optional[int]:
+        country_id = self._index.get(key)
+        if country_id is not None:
+            return country_id
+        for alias in self._aliases.get(key, ()):
+            country_id = self._index.get(alias)
+            if country_id is not None:
+                return country_id
+        return None
+
+    def get_id(self, title: Optional[str]) -> Optional[int]:
         """Возвращает id страны по названию или None, если не найдено."""
-        return self.map.get(title)
+        if not title:
+            return None
+        country_id = self.map.get(title)
+        if country_id is not None:
+            return country_id
+        key = normalize_title(title)
+        country_id = self._resolve(key)
+        if country_id is not None:
+            return country_id
+
+        now = time.monotonic()
+        missed_at = self._misses.get(key)
+        if missed_at is not None and now - missed_at < self.reload_interval:
+            return None
+        with self._lock:
+            if now - self._last_reload >= self.reload_interval:
+                self._reload_new(now)
+            country_id = self._resolve(key)
+            if country_id is None:
+                if key not in self._misses:
+                    logger.warning("Unknown country title {!r} – country_id left empty", title)
+                self._misses[key] = now
+        return country_id
+
+    def _reload_new(self, now: float) -> None:
+        """Дочитывает страны, добавленные после последней загрузки (под self._lock)."""
+        self._last_reload = now
+        with self.db.read() as cur:
+            cur.execute("SELECT id, common_title FROM countries WHERE id > %s", (self._max_id,))
+            rows = cur.fetchall()
+        if rows:
+            self._add_rows(rows)
+            self._misses.clear()
+            logger.info("Loaded {} new countries", len(rows))
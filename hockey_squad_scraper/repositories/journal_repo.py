@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+from hockey_squad_scraper.infrastructure.db import DB
+from hockey_squad_scraper.infrastructure.metrics import DB_STATEMENTS
+from hockey_squad_scraper.scraping.delta import ChangeEvent
+
+
+class JournalRepo:
+    """
+    Журнал изменений составов (outbox-таблица).
+
+    События пишутся в транзакции команды вместе с самими изменениями, поэтому
+    журнал не расходится с hockey_players. seq растёт монотонно; потребитель
+    хранит последний прочитанный seq и читает дальше через read_since().
+    Номера выделяются при вставке, а видны после commit, поэтому при
+    нескольких пишущих экземплярах строка с меньшим seq может появиться
+    позже — min_age в read_since() откладывает чтение самых свежих строк.
+    """
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS hockey_squad_changes (
+            seq        BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            created_at DATETIME        NOT NULL,
+            event      VARCHAR(32)     NOT NULL,
+            team_id    INT UNSIGNED    NOT NULL,
+            player_id  INT UNSIGNED    NULL,
+            payload    JSON            NULL,
+            KEY idx_team_seq (team_id, seq),
+            KEY idx_created_at (created_at)
+        ) ENGINE=InnoDB
+    """
+
+    def __init__(self, db: DB):
+        self.db = db
+
+    def ensure_schema(self) -> None:
+        """Создаёт таблицу журнала, если её ещё нет."""
+        self.db.cur.execute(self.DDL)
+        self.db.conn.commit()
+
+    def append(self, events: Iterable[ChangeEvent]) -> None:
+        """Добавляет события одним запросом (без commit — в транзакции команды)."""
+        events = list(events)
+        if not events:
+            return
+        sql = f"""
+            INSERT INTO hockey_squad_changes (created_at, event, team_id, player_id, payload)
+            VALUES {', '.join(['(NOW(), %s, %s, %s, %s)'] * len(events))}
+        """
+        args: List[Any] = []
+        for e in events:
+            args.extend((e.event, e.team_id, e.player_id, json.dumps(e.payload, ensure_ascii=False)))
+        DB_STATEMENTS.inc(op="journal")
+        self.db.cur.execute(sql, args)
+
+    def read_since(
+        self, cursor: int = 0, limit: int = 1000, team_id: Optional[int] = None, min_age: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает до limit событий с seq > cursor по возрастанию seq;
+        следующий cursor — seq последнего из них.
+        """
+        where = ["seq > %s"]
+        args: List[Any] = [cursor]
+        if team_id is not None:
+            where.append("team_id = %s")
+            args.append(team_id)
+        if min_age > 0:
+            where.append("created_at <= NOW() - INTERVAL %s SECOND")
+            args.append(min_age)
+        sql = f"""
+            SELECT seq, created_at, event, team_id, player_id, payload
+            FROM hockey_squad_changes
+            WHERE {' AND '.join(where)}
+            ORDER BY seq
+            LIMIT %s
+        """
+        with self.db.read() as cur:
+            cur.execute(sql, [*args, limit])
+            rows = cur.fetchall()
+        for row in rows:
+            if isinstance(row["payload"], (str, bytes)):
+                row["payload"] = json.loads(row["payload"])
+        return rows
+
+    def last_seq(self) -> int:
+        """Текущий максимальный seq (0 — журнал пуст): стартовый cursor для нового потребителя."""
+        with self.db.read() as cur:
+            cur.execute("SELECT MAX(seq) AS seq FROM hockey_squad_changes")
+            row = cur.fetchone()
+        return int(row["seq"] or 0) if row else 0
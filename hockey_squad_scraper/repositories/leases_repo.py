@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+from typing import Iterable, List, Optional, Set
+from hockey_squad_scraper.infrastructure.db import DB, Connection
+from hockey_squad_scraper.infrastructure.logger import logger
+
+
+class LeasesRepo:
+    """
+    Аренда команд между несколькими экземплярами runner.
+
+    Экземпляр захватывает команду, выставляя себя владельцем до lease_until.
+    Захватить можно команду без действующей аренды, которую никто не
+    обработал за последние cooldown секунд, — так за цикл команду
+    обрабатывает ровно один экземпляр. Аренда упавшего экземпляра истекает
+    через ttl секунд, и команда достаётся остальным.
+
+    Пока экземпляр жив, фоновый поток (start_heartbeat) раз в ttl/3 секунд
+    продлевает все его аренды через отдельное соединение — долгая загрузка
+    порции команд не отдаёт их другим экземплярам.
+    """
+
+    DDL = """
+        CREATE TABLE IF NOT EXISTS hockey_scraper_leases (
+            team_id     INT UNSIGNED NOT NULL PRIMARY KEY,
+            owner       VARCHAR(128) NULL,
+            lease_until DATETIME     NULL,
+            done_at     DATETIME     NULL,
+            KEY idx_lease_until (lease_until)
+        ) ENGINE=InnoDB
+    """
+
+    def __init__(self, db: DB, owner: str, ttl: int, cooldown: int):
+        self.db = db
+        self.owner = owner
+        self.ttl = ttl
+        self.cooldown = cooldown
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def ensure_schema(self) -> None:
+        """Создаёт таблицу аренды, если её ещё нет."""
+        self.db.cur.execute(self.DDL)
+        self.db.conn.commit()
+
+    def register(self, team_ids: Iterable[int]) -> None:
+        """Заводит строки аренды для новых команд."""
+        team_ids = list(team_ids)
+        if not team_ids:
+            return
+        sql = f"""
+            INSERT IGNORE INTO hockey_scraper_leases (team_id)
+            VALUES {', '.join(['(%s)'] * len(team_ids))}
+        """
+        self.db.cur.execute(sql, team_ids)
+        self.db.conn.commit()
+
+    def claim(self, team_ids: Iterable[int]) -> Set[int]:
+        """Захватывает свободные команды из списка и возвращает id захваченных."""
+        team_ids = list(team_ids)
+        if not team_ids:
+            return set()
+        placeholders = ", ".join(["%s"] * len(team_ids))
+        sql = f"""
+            UPDATE hockey_scraper_leases
+            SET owner = %s, lease_until = NOW() + INTERVAL %s SECOND
+            WHERE team_id IN ({placeholders})
+              AND (lease_until IS NULL OR lease_until < NOW() OR owner = %s)
+              AND (done_at IS NULL OR done_at < NOW() - INTERVAL %s SECOND)
+        """
+        self.db.cur.execute(sql, [self.owner, self.ttl, *team_ids, self.owner, self.cooldown])
+        self.db.conn.commit()
+
+        sql = f"""
+            SELECT team_id FROM hockey_scraper_leases
+            WHERE owner = %s AND lease_until > NOW() AND team_id IN ({placeholders})
+        """
+        self.db.cur.execute(sql, [self.owner, *team_ids])
+        return {row["team_id"] for row in self.db.cur.fetchall()}
+
+    def complete(self, team_id: int) -> None:
+        """Отмечает команду обработанной и снимает аренду (без commit — в транзакции команды)."""
+        sql = """
+            UPDATE hockey_scraper_leases
+            SET done_at = NOW(), lease_until = NULL, owner = NULL
+            WHERE team_id = %s AND owner = %s
+        """
+        self.db.cur.execute(sql, (team_id, self.owner))
+
+    def release(self, team_ids: Iterable[int]) -> None:
+        """Отпускает захваченные, но не обработанные команды."""
+        team_ids: List[int] = list(team_ids)
+        if not team_ids:
+            return
+        sql = f"""
+            UPDATE hockey_scraper_leases
+            SET lease_until = NULL, owner = NULL
+            WHERE owner = %s AND team_id IN ({', '.join(['%s'] * len(team_ids))})
+        """
+        self.db.cur.execute(sql, [self.owner, *team_ids])
+        self.db.conn.commit()
+
+    def renew(self, cur) -> int:
+        """Продлевает все аренды экземпляра на ttl секунд от текущего момента."""
+        sql = """
+            UPDATE hockey_scraper_leases
+            SET lease_until = NOW() + INTERVAL %s SECOND
+            WHERE owner = %s
+        """
+        return cur.execute(sql, (self.ttl, self.owner))
+
+    def start_heartbeat(self, connection: Connection, interval: Optional[float] = None) -> None:
+        """Запускает фоновое продление аренды через отдельное autocommit-соединение."""
+        interval = interval or max(1.0, self.ttl / 3)
+        self._stop.clear()
+
+        def run() -> None:
+            try:
+                while not self._stop.wait(interval):
+                    try:
+                        self.renew(connection.cur)
+                    except Exception as exc:
+                        logger.warning("Lease renewal failed: {}", exc)
+            finally:
+                connection.close()
+
+        self._heartbeat = threading.Thread(target=run, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._stop.set()
+            self._heartbeat.join()
+            self._heartbeat = None
@@ -1,56 +1,447 @@
 from __future__ import annotations
 
-from typing import Dict, Optional, Any
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Any, Set, Tuple
 from hockey_squad_scraper.infrastructure.db import DB
+from hockey_squad_scraper.infrastructure.logger import logger
+from hockey_squad_scraper.infrastructure.metrics import CACHE_RELOAD_SECONDS, DB_STATEMENTS
+from hockey_squad_scraper.infrastructure.snapshots import load_snapshot, save_snapshot
 
 
+CACHE_COLUMNS = (
+    "id", "team_id", "national_team_id", "fl_id", "position",
+    "number", "country_id", "first_name", "last_name",
+)
+
+
+class PlayerRow:
+    """
+    Строка кэша игроков: __slots__ вместо dict на каждого игрока, fl_id и
+    позиция интернированы. Читается как словарь (row["team_id"],
+    row.get("fl_id")); изменения — через replace(), возвращающий новую строку.
+    """
+
+    __slots__ = CACHE_COLUMNS
+
+    def __init__(
+        self, id, team_id, national_team_id, fl_id, position, number, country_id, first_name, last_name
+    ) -> None:
+        self.id = id
+        self.team_id = team_id
+        self.national_team_id = national_team_id
+        self.fl_id = sys.intern(fl_id) if isinstance(fl_id, str) else fl_id
+        self.position = sys.intern(position) if isinstance(position, str) else position
+        self.number = number
+        self.country_id = country_id
+        self.first_name = first_name
+        self.last_name = last_name
+
+    @classmethod
+    def from_mapping(cls, row: Mapping[str, Any]) -> "PlayerRow":
+        if isinstance(row, cls):
+            return row
+        return cls(*(row.get(col) for col in CACHE_COLUMNS))
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in CACHE_COLUMNS else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in CACHE_COLUMNS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CACHE_COLUMNS)
+
+    def keys(self) -> Tuple[str, ...]:
+        return CACHE_COLUMNS
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, col) for col in CACHE_COLUMNS)
+
+    def replace(self, fields: Mapping[str, Any]) -> "PlayerRow":
+        """Копия строки с заменёнными полями кэша (прочие ключи игнорируются)."""
+        values = [fields[col] if col in fields else getattr(self, col) for col in CACHE_COLUMNS]
+        return PlayerRow(*values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PlayerRow):
+            return self.as_tuple() == other.as_tuple()
+        if isinstance(other, Mapping):
+            return dict(zip(CACHE_COLUMNS, self.as_tuple())) == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PlayerRow({dict(zip(CACHE_COLUMNS, self.as_tuple()))!r})"
+
 
 class PlayersRepo:
     """
-    Репозиторий игроков: хранит кэш и предоставляет CRUD-операции
+    Репозиторий игроков: хранит кэш и предоставляет CRUD-операции.
+
+    Помимо основного кэша id → строка поддерживает вторичные индексы
+    fl_id → строка, team_id → {id} и national_team_id → {id}, чтобы поиск
+    игрока и выборка текущего состава не сканировали весь кэш.
+
+    В режиме write_through мутации правят только затронутые строки кэша
+    записанными значениями; полный refresh_cache() остаётся для
+    периодической сверки с БД.
+
+    Если задан snapshot_path, при старте кэш берётся из локального снимка,
+    после чего из БД дочитываются только строки с updated_at не старше
+    watermark снимка (время БД на момент последней сверки за вычетом
+    WATERMARK_LAG на незакоммиченные транзакции). snapshot_source (хост/база)
+    не даёт подхватить снимок другой БД.
     """
 
-    def __init__(self, db: DB):
+    WATERMARK_LAG = 60
+    # Сколько id в одном IN (...) при дочитывании недостающих строк
+    LOAD_CHUNK = 1000
+
+    def __init__(
+        self,
+        db: DB,
+        write_through: bool = True,
+        snapshot_path: Optional[Path | str] = None,
+        snapshot_source: str = "",
+        snapshot_max_age: float = 86400,
+    ):
         self.db = db
-        self.cache: Dict[int, Dict[str, Any]] = {}
-        self.refresh_cache()
+        self.write_through = write_through
+        self.snapshot_path = snapshot_path
+        self.snapshot_key = f"hockey_players@{snapshot_source}"
+        self.snapshot_max_age = snapshot_max_age
+        self.watermark: Optional[datetime] = None
+        self.cache: Dict[int, PlayerRow] = {}
+        self._by_fl_id: Dict[str, PlayerRow] = {}
+        # id остальных строк с тем же fl_id (в _by_fl_id — строка с наименьшим id)
+        self._fl_id_dups: Dict[str, Set[int]] = {}
+        self._by_team: Dict[int, Set[int]] = {}
+        self._by_national: Dict[int, Set[int]] = {}
+        if snapshot_path is None or not self.load_snapshot():
+            self.refresh_cache()
+
+
+    def _execute(self, op: str, sql: str, args: Any = None, cur: Any = None) -> None:
+        """Выполняет запрос (по умолчанию на основном соединении), учитывая его в hockey_db_statements_total."""
+        DB_STATEMENTS.inc(op=op)
+        (cur or self.db.cur).execute(sql, args)
+
+    def refresh_cache(self, on_primary: bool = False) -> None:
+        """
+        Обновляет кэш: загружеает всех игроков из БД в память построчно
+        через небуферизованный курсор соединения для чтения. on_primary —
+        читать основным соединением, чтобы внутри открытой транзакции были
+        видны только что записанные строки.
+        """
 
+        sql = f"SELECT {', '.join(CACHE_COLUMNS)} FROM hockey_players"
+        with CACHE_RELOAD_SECONDS.time():
+            cache: Dict[int, PlayerRow] = {}
+            if on_primary:
+                cur = self.db.cur
+                watermark = self._db_now(cur)
+                self._execute("select", sql, cur=cur)
+                for row in cur.fetchall():
+                    cache[row["id"]] = PlayerRow.from_mapping(row)
+            else:
+                with self.db.read() as cur:
+                    watermark = self._db_now(cur)
+                with self.db.stream() as cur:
+                    self._execute("select", sql, cur=cur)
+                    for values in cur:
+                        cache[values[0]] = PlayerRow(*values)
+            self.cache = cache
+            self._rebuild_indexes()
+            self.watermark = watermark
 
-    def refresh_cache(self) -> None:
-        """Обновляет кэш: загружеает всех игроков из БД в память."""
+    @staticmethod
+    def _db_now(cur: Any) -> datetime:
+        """Текущее время по часам БД — watermark для последующих сверок."""
+        cur.execute("SELECT NOW() AS now")
+        return cur.fetchone()["now"]
 
+    def refresh_changed(self, check_deletions: bool = True) -> int:
+        """
+        Дочитывает в кэш строки, изменённые после watermark, и сдвигает его;
+        возвращает их число. С check_deletions сверяет число строк таблицы
+        с кэшем: если кэш больше, убирает из него удалённых игроков, если
+        меньше — дочитывает недостающие строки (записанные с updated_at
+        старше watermark).
+        """
+        if self.watermark is None:
+            self.refresh_cache()
+            return len(self.cache)
         sql = """
             SELECT id, team_id, national_team_id, fl_id, position,
                    number, country_id, first_name, last_name
             FROM hockey_players
+            WHERE updated_at >= %s
         """
-        self.db.cur.execute(sql)
-        self.cache = {row["id"]: row for row in self.db.cur.fetchall()}
+        with self.db.read() as cur:
+            watermark = self._db_now(cur)
+            self._execute("select", sql, (self.watermark - timedelta(seconds=self.WATERMARK_LAG),), cur=cur)
+            rows = cur.fetchall()
+            for row in rows:
+                self._put_row(row)
+            if check_deletions:
+                self._execute("select", "SELECT COUNT(*) AS n FROM hockey_players", cur=cur)
+                total = cur.fetchone()["n"]
+        if check_deletions and total > len(self.cache):
+            self._load_missing()
+        elif check_deletions and total < len(self.cache):
+            self._drop_deleted()
+        self.watermark = watermark
+        return len(rows)
 
+    def _table_ids(self) -> Set[int]:
+        """id всех игроков таблицы (потоково, через соединение для чтения)."""
+        with self.db.stream() as cur:
+            self._execute("select", "SELECT id FROM hockey_players", cur=cur)
+            return {values[0] for values in cur}
 
-    def find_by_fl_id(self, fl_id: str) -> Optional[Dict[str, Any]]:
-        """Возвращает игрока по fl_id: сперва ищет в кэше, затем в БД"""
+    def _drop_deleted(self) -> None:
+        """
+        Убирает из кэша игроков, которых нет в таблице. Вызывается, когда кэш
+        больше таблицы: все изменённые строки уже в нём, значит разница — удалённые.
+        """
+        existing = self._table_ids()
+        deleted = [pid for pid in self.cache if pid not in existing]
+        for pid in deleted:
+            self._drop_row(pid)
+        logger.info("Dropped {} deleted players from cache", len(deleted))
+
+    def _load_missing(self) -> None:
+        """
+        Дочитывает в кэш строки таблицы, которых в нём нет. Вызывается, когда
+        кэш меньше таблицы: строки вставлены с updated_at старше watermark
+        (перенос данных, ручная правка) и выборкой по времени не находятся.
+        """
+        missing = sorted(self._table_ids().difference(self.cache))
+        with self.db.read() as cur:
+            for start in range(0, len(missing), self.LOAD_CHUNK):
+                chunk = missing[start:start + self.LOAD_CHUNK]
+                self._execute(
+                    "select",
+                    f"SELECT {', '.join(CACHE_COLUMNS)} FROM hockey_players "
+                    f"WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                    chunk,
+                    cur=cur,
+                )
+                for row in cur.fetchall():
+                    self._put_row(row)
+        logger.info("Loaded {} players missing from cache", len(missing))
 
+    def load_snapshot(self) -> bool:
+        """Загружает кэш из снимка и сверяет его с БД; False — снимка нет или он не подходит."""
+        snapshot = load_snapshot(self.snapshot_path, self.snapshot_key, self.snapshot_max_age)
+        if snapshot is None or tuple(snapshot["columns"]) != CACHE_COLUMNS:
+            return False
+        self.cache = {values[0]: PlayerRow(*values) for values in snapshot["rows"]}
+        self._rebuild_indexes()
+        self.watermark = snapshot["watermark"]
+        changed = self.refresh_changed()
+        logger.info(
+            "Players cache warm-started from snapshot: {} rows, {} changed since it",
+            len(self.cache), changed,
+        )
+        return True
+
+    def save_snapshot(self) -> None:
+        """Сохраняет кэш в локальный снимок (если путь задан и кэш хоть раз сверен с БД)."""
+        if self.snapshot_path is None or self.watermark is None:
+            return
+        save_snapshot(self.snapshot_path, self.snapshot_key, {
+            "watermark": self.watermark,
+            "columns": CACHE_COLUMNS,
+            "rows": [row.as_tuple() for row in self.cache.values()],
+        })
+
+    def _rebuild_indexes(self) -> None:
+        """Пересобирает вторичные индексы по текущему содержимому кэша."""
+        self._by_fl_id = {}
+        self._fl_id_dups = {}
+        self._by_team = {}
+        self._by_national = {}
         for row in self.cache.values():
-            if row["fl_id"] == fl_id:
-                return row
+            self._index_row(row)
+
+    def _index_row(self, row: PlayerRow) -> None:
+        """Добавляет строку во вторичные индексы; по fl_id — с наименьшим id, как и выборка из БД."""
+        current = self._by_fl_id.get(row.fl_id)
+        if current is None or current.id == row.id:
+            self._by_fl_id[row.fl_id] = row
+        elif row.id < current.id:
+            self._by_fl_id[row.fl_id] = row
+            self._fl_id_dups.setdefault(row.fl_id, set()).add(current.id)
+        else:
+            self._fl_id_dups.setdefault(row.fl_id, set()).add(row.id)
+        if row.team_id is not None:
+            self._by_team.setdefault(row.team_id, set()).add(row.id)
+        if row.national_team_id is not None:
+            self._by_national.setdefault(row.national_team_id, set()).add(row.id)
+
+    def _unindex_row(self, row: PlayerRow) -> None:
+        """Убирает строку из вторичных индексов."""
+        if self._by_fl_id.get(row.fl_id) is row:
+            del self._by_fl_id[row.fl_id]
+            # Индекс переходит к следующему по id дубликату, если он ещё в кэше
+            dups = sorted(pid for pid in self._fl_id_dups.pop(row.fl_id, ()) if pid in self.cache)
+            if dups:
+                self._by_fl_id[row.fl_id] = self.cache[dups[0]]
+                if len(dups) > 1:
+                    self._fl_id_dups[row.fl_id] = set(dups[1:])
+        else:
+            dups = self._fl_id_dups.get(row.fl_id)
+            if dups is not None:
+                dups.discard(row.id)
+                if not dups:
+                    del self._fl_id_dups[row.fl_id]
+        for index, key in ((self._by_team, row.team_id), (self._by_national, row.national_team_id)):
+            ids = index.get(key)
+            if ids is None:
+                continue
+            ids.discard(row.id)
+            if not ids:
+                del index[key]
+
+    def _drop_row(self, player_id: int) -> None:
+        """Удаляет строку из кэша и индексов."""
+        old = self.cache.pop(player_id, None)
+        if old is not None:
+            self._unindex_row(old)
+
+    def _put_row(self, row: Mapping[str, Any]) -> PlayerRow:
+        """Кладёт строку в кэш (как PlayerRow), заменяя прежнюю версию и обновляя индексы."""
+        row = PlayerRow.from_mapping(row)
+        old = self.cache.get(row.id)
+        if old is not None:
+            self._unindex_row(old)
+        self.cache[row.id] = row
+        self._index_row(row)
+        return row
+
+
+    def find_by_fl_id(self, fl_id: str) -> Optional[PlayerRow]:
+        """Возвращает игрока по fl_id: сперва ищет в кэше, затем в БД"""
+
+        row = self._by_fl_id.get(fl_id)
+        if row is not None:
+            return row
 
         sql = """
             SELECT id, team_id, national_team_id, fl_id, position, number,
                    country_id, first_name, last_name
             FROM hockey_players
             WHERE fl_id = %s
+            ORDER BY id
             LIMIT 1
         """
-        self.db.cur.execute(sql, (fl_id,))
+        self._execute("select", sql, (fl_id,))
+        row = self.db.cur.fetchone()
+        return self._put_row(row) if row else None
+
+    def reload_row(self, player_id: int) -> Optional[PlayerRow]:
+        """Перечитывает из БД одну строку кэша (или убирает её, если игрока нет)."""
+
+        sql = """
+            SELECT id, team_id, national_team_id, fl_id, position, number,
+                   country_id, first_name, last_name
+            FROM hockey_players
+            WHERE id = %s
+        """
+        self._execute("select", sql, (player_id,))
         row = self.db.cur.fetchone()
         if row:
-            self.cache[row["id"]] = row
-        return row
+            return self._put_row(row)
+        self._drop_row(player_id)
+        return None
+
+    def _patch_row(self, player_id: int, fields: Dict[str, Any]) -> None:
+        """Применяет к кэшу только что записанные значения полей игрока."""
+        old = self.cache.get(player_id)
+        if old is None:
+            self.reload_row(player_id)
+            return
+        self._put_row(old.replace(fields))
+
+    def _after_write(self, player_id: int, fields: Dict[str, Any]) -> None:
+        """Синхронизирует кэш после записи: точечно или полной перезагрузкой."""
+        if self.write_through:
+            self._patch_row(player_id, fields)
+        else:
+            self.refresh_cache(on_primary=True)
+
+    def find_many_by_fl_id(self, fl_ids: Iterable[str]) -> Dict[str, PlayerRow]:
+        """Возвращает игроков по списку fl_id: кэш, затем один запрос в БД на промахи."""
+
+        found: Dict[str, PlayerRow] = {}
+        missing: List[str] = []
+        for fl_id in fl_ids:
+            row = self._by_fl_id.get(fl_id)
+            if row is not None:
+                found[fl_id] = row
+            elif fl_id not in missing:
+                missing.append(fl_id)
+        if not missing:
+            return found
+
+        sql = f"""
+            SELECT id, team_id, national_team_id, fl_id, position, number,
+                   country_id, first_name, last_name
+            FROM hockey_players
+            WHERE fl_id IN ({', '.join(['%s'] * len(missing))})
+            ORDER BY id
+        """
+        self._execute("select", sql, missing)
+        for row in self.db.cur.fetchall():
+            if row["fl_id"] not in found:
+                found[row["fl_id"]] = self._put_row(row)
+        return found
+
+    def reload_rows(self, ids: Iterable[int] = (), fl_ids: Iterable[str] = ()) -> None:
+        """Перечитывает из БД указанные строки кэша, отбрасывая исчезнувшие."""
+
+        ids, fl_ids = set(ids), set(fl_ids)
+        ids |= {self._by_fl_id[fl]["id"] for fl in fl_ids if fl in self._by_fl_id}
+        if not ids and not fl_ids:
+            return
+        conds, values = [], []
+        if ids:
+            conds.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+            values.extend(ids)
+        if fl_ids:
+            conds.append(f"fl_id IN ({', '.join(['%s'] * len(fl_ids))})")
+            values.extend(fl_ids)
+        sql = f"""
+            SELECT id, team_id, national_team_id, fl_id, position, number,
+                   country_id, first_name, last_name
+            FROM hockey_players
+            WHERE {' OR '.join(conds)}
+        """
+        self._execute("select", sql, values)
+        rows = self.db.cur.fetchall()
+        for pid in ids - {row["id"] for row in rows}:
+            self._drop_row(pid)
+        for row in rows:
+            self._put_row(row)
+
+    def squad_ids(self, team_id: int, is_club: bool) -> Set[int]:
+        """Возвращает id игроков, привязанных к клубу или сборной team_id."""
+        index = self._by_team if is_club else self._by_national
+        return set(index.get(team_id, ()))
 
 
     def update_player(self, player_id: int, fields: Dict[str, Any]) -> None:
-        """Обновляет указанные поля игрока и перезагрузить кэш."""
+        """Обновляет указанные поля игрока и синхронизирует кэш."""
 
         if not fields:
             return
@@ -60,8 +451,8 @@ class PlayersRepo:
             values.append(val)
         values.append(player_id)
         sql = f"UPDATE hockey_players SET {', '.join(sets)}, updated_at = NOW() WHERE id = %s"
-        self.db.cur.execute(sql, values)
-        self.refresh_cache()
+        self._execute("update", sql, values)
+        self._after_write(player_id, fields)
 
     def insert_player(self, data: Dict[str, Any]) -> int:
         """Создает нового игрока и вернуть его id."""
@@ -72,17 +463,116 @@ class PlayersRepo:
             INSERT INTO hockey_players ({', '.join(cols)}, created_at, updated_at)
             VALUES ({placeholders}, NOW(), NOW())
         """
-        self.db.cur.execute(sql, values)
+        self._execute("insert", sql, values)
         player_id = self.db.cur.lastrowid
-        self.refresh_cache()
+        if self.write_through:
+            self._put_row({col: data.get(col) for col in CACHE_COLUMNS} | {"id": player_id})
+        else:
+            self.refresh_cache(on_primary=True)
         return player_id
 
     def clear_team_link(self, player_id: int, field: str) -> None:
         """Сбросить связь с командой/сборной у игрока."""
 
         sql = f"UPDATE hockey_players SET {field} = NULL, updated_at = NOW() WHERE id = %s"
-        self.db.cur.execute(sql, (player_id,))
-        self.refresh_cache()
+        self._execute("update", sql, (player_id,))
+        self._after_write(player_id, {field: None})
+
+    def update_players(self, changes: Dict[int, Dict[str, Any]]) -> None:
+        """Обновляет поля нескольких игроков одним UPDATE с CASE по id."""
+
+        changes = {pid: fields for pid, fields in changes.items() if fields}
+        if not changes:
+            return
+        columns = sorted({col for fields in changes.values() for col in fields})
+        sets, values = [], []
+        for col in columns:
+            whens = []
+            for pid, fields in changes.items():
+                if col in fields:
+                    whens.append("WHEN %s THEN %s")
+                    values.extend((pid, fields[col]))
+            sets.append(f"{col} = CASE id {' '.join(whens)} ELSE {col} END")
+        values.extend(changes)
+        sql = f"""
+            UPDATE hockey_players
+            SET {', '.join(sets)}, updated_at = NOW()
+            WHERE id IN ({', '.join(['%s'] * len(changes))})
+        """
+        self._execute("update", sql, values)
+        if self.write_through:
+            for pid, fields in changes.items():
+                self._patch_row(pid, fields)
+        else:
+            self.refresh_cache(on_primary=True)
+
+    def insert_players(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Создаёт нескольких игроков многострочными INSERT и возвращает fl_id → id.
+
+        Строки группируются по набору непустых колонок, чтобы пропущенные
+        значения, как и в insert_player, получали DEFAULT из схемы.
+        """
+
+        groups: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+        for data in rows:
+            cols, values = zip(*[(k, v) for k, v in data.items() if v is not None])
+            groups.setdefault(cols, []).append(values)
+        for cols, group in groups.items():
+            row_sql = f"({', '.join(['%s'] * len(cols))}, NOW(), NOW())"
+            sql = f"""
+                INSERT INTO hockey_players ({', '.join(cols)}, created_at, updated_at)
+                VALUES {', '.join([row_sql] * len(group))}
+            """
+            self._execute("insert", sql, [v for values in group for v in values])
+
+        fl_ids = [data["fl_id"] for data in rows]
+        sql = f"""
+            SELECT id, team_id, national_team_id, fl_id, position, number,
+                   country_id, first_name, last_name
+            FROM hockey_players
+            WHERE fl_id IN ({', '.join(['%s'] * len(fl_ids))})
+            ORDER BY id
+        """
+        self._execute("select", sql, fl_ids)
+        inserted = {row["fl_id"]: row for row in self.db.cur.fetchall()}
+        if self.write_through:
+            for row in inserted.values():
+                self._put_row(row)
+        else:
+            self.refresh_cache(on_primary=True)
+        return {fl_id: row["id"] for fl_id, row in inserted.items()}
+
+    def clear_team_links(self, player_ids: Iterable[int], field: str) -> None:
+        """Сбрасывает связь с командой/сборной сразу у нескольких игроков."""
+
+        player_ids = list(player_ids)
+        if not player_ids:
+            return
+        sql = f"""
+            UPDATE hockey_players SET {field} = NULL, updated_at = NOW()
+            WHERE id IN ({', '.join(['%s'] * len(player_ids))})
+        """
+        self._execute("update", sql, player_ids)
+        if self.write_through:
+            for pid in player_ids:
+                self._patch_row(pid, {field: None})
+        else:
+            self.refresh_cache(on_primary=True)
+
+    def insert_translations(
+            self, rows: List[Tuple[int, str, Optional[str], Optional[str]]]
+    ) -> None:
+        """Добавляет русские локализации нескольких игроков одним INSERT."""
+
+        if not rows:
+            return
+        sql = f"""
+            INSERT INTO hockey_player_translations
+                   (hockey_player_id, locale, title, first_name, last_name, locale_enabled)
+            VALUES {', '.join(["(%s, 'ru', %s, %s, %s, 1)"] * len(rows))}
+        """
+        self._execute("insert_translation", sql, [v for row in rows for v in row])
 
     def insert_translation(
             self,
@@ -98,4 +588,4 @@ class PlayersRepo:
                    (hockey_player_id, locale, title, first_name, last_name, locale_enabled)
             VALUES (%s, 'ru', %s, %s, %s, 1)
         """
-        self.db.cur.execute(sql, (player_id, title_ru, first_name, last_name))
\ No newline at end of file
+        self._execute("insert_translation", sql, (player_id, title_ru, first_name, last_name))
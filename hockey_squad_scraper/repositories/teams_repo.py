@@ -23,5 +23,6 @@ class TeamsRepo:
                    ON ttc.team_id = t.id AND ttc.is_primary = 1
             LEFT JOIN hockey_competitions c ON c.id = ttc.competition_id
         """
-        self.db.cur.execute(sql)
-        return self.db.cur.fetchall()
+        with self.db.read() as cur:
+            cur.execute(sql)
+            return cur.fetchall()
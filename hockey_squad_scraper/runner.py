@@ -1,29 +1,209 @@
 from __future__ import annotations
 
+import argparse
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
 
 from hockey_squad_scraper.infrastructure.config import Settings
 from hockey_squad_scraper.infrastructure.db import DB
+from hockey_squad_scraper.infrastructure.fingerprints import FingerprintStore
 from hockey_squad_scraper.infrastructure.http_client import HttpClient
-from hockey_squad_scraper.repositories.countries_repo import CountriesRepo
+from hockey_squad_scraper.infrastructure.metrics import start_http_server
+from hockey_squad_scraper.infrastructure.page_archive import PageArchive, ReplayHttpClient
+from hockey_squad_scraper.infrastructure.profiling import Profiler
+from hockey_squad_scraper.repositories.checkpoints_repo import CheckpointsRepo
+from hockey_squad_scraper.repositories.countries_repo import ALIAS_GROUPS, CountriesRepo, load_alias_file
+from hockey_squad_scraper.repositories.journal_repo import JournalRepo
+from hockey_squad_scraper.repositories.leases_repo import LeasesRepo
 from hockey_squad_scraper.repositories.players_repo import PlayersRepo
 from hockey_squad_scraper.repositories.teams_repo import TeamsRepo
+from hockey_squad_scraper.scraping.scheduler import TeamScheduler
 from hockey_squad_scraper.scraping.scraper import SquadScraper
 from hockey_squad_scraper.infrastructure.logger import logger
 
 
+def _sweep_step(cfg: Settings, scraper: SquadScraper, http: HttpClient) -> Callable[[], None]:
+    """Полный проход по всем командам, затем пауза main_loop_delay."""
+    def step() -> None:
+        scraper.run_one_cycle()
+        logger.info("Proxies: {}", http.pool.summary())
+        time.sleep(cfg.main_loop_delay)
+    return step
 
 
-def main() -> None:
+def _adaptive_step(
+    cfg: Settings, scraper: SquadScraper, http: HttpClient, teams_repo: TeamsRepo
+) -> Callable[[], None]:
+    """
+    Проверка команд по TeamScheduler. Циклом считается окно main_loop_delay:
+    в его начале обновляется список команд и выполняется подготовка цикла.
+    """
+    scheduler = TeamScheduler.from_settings(cfg)
+    window_end = 0.0
+
+    def step() -> None:
+        nonlocal window_end
+        now = time.monotonic()
+        if now >= window_end:
+            if window_end:
+                scraper.finish_cycle()
+                logger.info("Proxies: {}", http.pool.summary())
+            scraper.start_cycle()
+            scheduler.sync_teams(teams_repo.list_teams(), now)
+            window_end = now + cfg.main_loop_delay
+
+        batch = scheduler.pop_due(now)
+        if batch:
+            try:
+                with scraper.profile_cycle("batch"):
+                    outcomes = scraper.run_teams(batch)
+            except Exception:
+                # Извлечённые из очереди команды иначе пропали бы из расписания до перезапуска
+                scheduler.requeue(batch)
+                raise
+            scheduler.record(outcomes)
+            # При SHARDING=1 команды, захваченные другими экземплярами, исхода не получают
+            scheduler.requeue(team for team in batch if team["id"] not in outcomes)
+            logger.info(
+                "Checked {} teams ({} changed), next in {:.0f}s",
+                len(outcomes), sum(1 for o in outcomes.values() if o), scheduler.seconds_until_next() or 0,
+            )
+            return
+        wait = min(window_end - now, cfg.scheduler_tick)
+        next_due = scheduler.seconds_until_next(now)
+        if next_due is not None:
+            wait = min(wait, next_due)
+        time.sleep(max(1.0, wait))
+
+    return step
+
+
+def _replay(
+    scraper: SquadScraper, teams_repo: TeamsRepo, archive: PageArchive, team_ids: Set[int]
+) -> None:
+    """Один проход по командам из архива: страницы берутся из него, а не из сети."""
+    archived = set(archive.team_ids())
+    teams = [
+        team for team in teams_repo.list_teams()
+        if team["id"] in archived and (not team_ids or team["id"] in team_ids)
+    ]
+    logger.info("Replaying archived pages of {} teams", len(teams))
+    scraper.start_cycle()
+    outcomes = scraper.run_teams(teams)
+    scraper.finish_cycle()
+    logger.info(
+        "Replay done: {} changed, {} unchanged, {} failed",
+        sum(1 for o in outcomes.values() if o is True),
+        sum(1 for o in outcomes.values() if o is False),
+        sum(1 for o in outcomes.values() if o is None),
+    )
+
+
+def _warm_up(cfg: Settings, db: DB) -> Tuple[PlayersRepo, CountriesRepo]:
+    """Загрузка кэшей репозиториев через пул чтения — идёт параллельно с начальной задержкой HttpClient."""
+    started = time.monotonic()
+    players_repo = PlayersRepo(
+        db,
+        write_through=cfg.cache_write_through,
+        snapshot_path=Path(cfg.state_dir) / "players.snapshot" if cfg.cache_snapshot else None,
+        snapshot_source=f"{cfg.db_host}:{cfg.db_port}/{cfg.db_name}",
+        snapshot_max_age=cfg.cache_snapshot_max_age,
+    )
+    aliases = ALIAS_GROUPS
+    if cfg.country_aliases_file:
+        aliases += load_alias_file(cfg.country_aliases_file)
+    countries_repo = CountriesRepo(db, aliases=aliases, reload_interval=cfg.countries_reload_interval)
+    logger.info("Caches warmed up in {:.1f}s", time.monotonic() - started)
+    return players_repo, countries_repo
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="hockey_squad_scraper.runner")
+    parser.add_argument(
+        "--replay", action="store_true",
+        help="однократно прогнать сохранённые в архиве страницы через SquadScraper без сети",
+    )
+    parser.add_argument(
+        "--until", type=datetime.fromisoformat,
+        help="для --replay: брать версии страниц не новее момента (ISO 8601, локальное время)",
+    )
+    parser.add_argument("--teams", default="", help="для --replay: id команд через запятую")
+    parser.add_argument(
+        "--rebuild-index", action="store_true", help="пересобрать индекс архива страниц перед запуском",
+    )
+    return parser.parse_args(argv)
+
+
+def _check_settings(cfg: Settings, args: argparse.Namespace) -> None:
+    """Проверяет сочетания настроек, с которыми запускаться нельзя."""
+    checkpoints = cfg.checkpoints and cfg.scheduler != "adaptive" and not args.replay
+    if checkpoints and cfg.sharding and not cfg.worker_id_explicit:
+        # Цикл принадлежит WORKER_ID: процессы одного хоста продолжали бы циклы друг друга
+        raise ValueError("CHECKPOINTS=1 вместе с SHARDING=1 требует явного WORKER_ID, своего у каждого процесса")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
     cfg = Settings()
+    _check_settings(cfg, args)
+    if cfg.metrics_port and not args.replay:
+        start_http_server(cfg.metrics_port, cfg.metrics_addr)
 
+    archive = None
+    if cfg.archive_pages or args.replay or args.rebuild_index:
+        archive = PageArchive(
+            cfg.archive_dir or Path(cfg.state_dir) / "archive",
+            segment_size=cfg.archive_segment_mb * 1024 * 1024,
+        )
+        if args.rebuild_index:
+            archive.rebuild_index()
 
     db = DB(cfg)
-    http = HttpClient(cfg)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-up") as executor:
+        warm_up = executor.submit(_warm_up, cfg, db)
+        if args.replay:
+            http = ReplayHttpClient(archive, until=args.until.timestamp() if args.until else None)
+        else:
+            http = HttpClient(cfg, archive=archive if cfg.archive_pages else None)
+        players_repo, countries_repo = warm_up.result()
 
     teams_repo = TeamsRepo(db)
-    players_repo = PlayersRepo(db)
-    countries_repo = CountriesRepo(db)
+
+    leases = None
+    if cfg.sharding and not args.replay:
+        leases = LeasesRepo(
+            db,
+            owner=f"{cfg.worker_id}:{os.getpid()}",
+            ttl=cfg.lease_ttl,
+            cooldown=cfg.lease_cooldown,
+        )
+        leases.ensure_schema()
+        leases.start_heartbeat(db.dedicated())
+        if cfg.skip_unchanged:
+            # Отпечатки локальны: команду мог синхронизировать другой экземпляр
+            logger.warning("SKIP_UNCHANGED is ignored with SHARDING=1")
+
+    journal = None
+    if cfg.journal_enabled:
+        journal = JournalRepo(db)
+        journal.ensure_schema()
+
+    checkpoints = None
+    if cfg.checkpoints and cfg.scheduler != "adaptive" and not args.replay:
+        checkpoints = CheckpointsRepo(db, worker=cfg.worker_id, max_age=cfg.checkpoint_max_age)
+        checkpoints.ensure_schema()
+
+    profiler = Profiler(
+        Path(cfg.state_dir) / "profiles",
+        top_n=cfg.profile_top,
+        profile_next_cycle=cfg.profile_cycle,
+        team_ids=cfg.profile_teams,
+    )
+    profiler.install_signal()
 
     scraper = SquadScraper(
         db=db,
@@ -32,21 +212,43 @@ def main() -> None:
         players_repo=players_repo,
         countries_repo=countries_repo,
         cfg=cfg,
+        fingerprints=(
+            FingerprintStore(Path(cfg.state_dir) / "fingerprints.json")
+            if cfg.skip_unchanged and not args.replay and leases is None else None
+        ),
+        leases=leases,
+        profiler=profiler,
+        journal=journal,
+        checkpoints=checkpoints,
     )
 
-    logger.info("Scraper started - loop delay: {}s", cfg.main_loop_delay)
+    if args.replay:
+        try:
+            _replay(scraper, teams_repo, archive, {int(x) for x in args.teams.split(",") if x.strip()})
+        finally:
+            scraper.close()
+        return
+
+    if cfg.scheduler == "adaptive":
+        step = _adaptive_step(cfg, scraper, http, teams_repo)
+    else:
+        step = _sweep_step(cfg, scraper, http)
+
+    logger.info("Scraper started - mode: {}, loop delay: {}s", cfg.scheduler, cfg.main_loop_delay)
 
     while True:
         try:
-            scraper.run_one_cycle()
-            time.sleep(cfg.main_loop_delay)
+            step()
         except KeyboardInterrupt:
             logger.info("[STOP] interrupted by user")
+            players_repo.save_snapshot()
+            scraper.close()
             break
         except Exception as exc:
             logger.opt(exception=exc).error("Unhandled exception — sleeping {} s", cfg.error_delay)
             time.sleep(cfg.error_delay)
-            db.reconnect()
+            # Соединения сами проверяются ping-ом после простоя или упавшей транзакции
+            players_repo.refresh_cache()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+
+@dataclass
+class SquadDelta:
+    """Изменения состава одной команды, применяемые к БД одним пакетом."""
+
+    team_id: int
+    is_club: bool
+    updates: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    inserts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    removed: Set[int] = field(default_factory=set)
+    transfers: Dict[int, Optional[int]] = field(default_factory=dict)
+
+    @property
+    def link_field(self) -> str:
+        """Колонка связи игрока с командой: клуб или сборная."""
+        return "team_id" if self.is_club else "national_team_id"
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.updates or self.inserts or self.removed)
+
+    def add_update(self, player_id: int, fields: Dict[str, Any]) -> None:
+        """Накапливает изменённые поля игрока (повторные записи дополняют прежние)."""
+        self.updates.setdefault(player_id, {}).update(fields)
+
+    def add_transfer(self, player_id: int, previous_team_id: Optional[int]) -> None:
+        """Запоминает переход игрока в команду и прежнее значение связи."""
+        self.transfers[player_id] = previous_team_id
+        self.add_update(player_id, {self.link_field: self.team_id})
+
+    def add_insert(self, row: Dict[str, Any]) -> None:
+        """Добавляет нового игрока; повтор того же fl_id дополняет непустые поля."""
+        known = self.inserts.get(row["fl_id"])
+        if known is None:
+            self.inserts[row["fl_id"]] = row
+            return
+        known.update((k, v) for k, v in row.items() if v is not None)
+
+
+@dataclass
+class ParsedSquad:
+    """Результат разбора страницы состава: тип команды, игроки и отпечаток таблицы."""
+
+    is_club: bool
+    players: List[Dict[str, Any]]
+    fingerprint: Optional[str] = None
+
+
+@dataclass
+class ChangeEvent:
+    """Событие журнала изменений составов."""
+
+    TRANSFER = "transfer"
+    NEW_PLAYER = "new_player"
+    REMOVAL = "removal"
+    NATIONAL_FLIP = "national_flip"
+
+    event: str
+    team_id: int
+    player_id: Optional[int] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
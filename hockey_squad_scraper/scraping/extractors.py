@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+
+NATIONAL_TEAM_FLAGS = {
+    "fl_02",
+    "fl_1",
+    "fl_2",
+    "fl_290",
+    "fl_292",
+    "fl_3",
+    "fl_4",
+    "fl_450",
+    "fl_451",
+    "fl_453",
+    "fl_5",
+    "fl_6",
+    "fl_7",
+    "fl_8",
+}
+
+CountryLookup = Callable[[Optional[str]], Optional[int]]
+
+
+class SoupExtractor:
+    """Разбор страницы состава через полное дерево BeautifulSoup."""
+
+    name = "soup"
+    NATIONAL_TEAM_FLAGS = NATIONAL_TEAM_FLAGS
+
+    def __init__(self, country_lookup: CountryLookup) -> None:
+        self.country_lookup = country_lookup
+
+    def extract(self, html: str, team: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Возвращает признак клуба и игроков всех позиций, кроме тренеров."""
+        soup = BeautifulSoup(html, "lxml")
+        is_club = self._determine_if_club(soup)
+        players: List[Dict[str, Any]] = []
+        for table in soup.select("div#overall-all-table div.lineupTable"):
+            position = self._get_position_from_table(table)
+            if position == "coach":
+                continue
+            players.extend(self._extract_players_from_table(table, position, team))
+        return is_club, players
+
+    def _determine_if_club(self, soup: BeautifulSoup) -> bool:
+        """Добавляет определение, является ли команда клубом или сборной"""
+        flag_spans = soup.select("span.breadcrumb__flag")
+        if not flag_spans:
+            return True
+        classes = flag_spans[0].get("class", [])
+        return not any(cls in self.NATIONAL_TEAM_FLAGS for cls in classes)
+
+    def _get_position_from_table(self, table) -> Optional[str]:
+        """Добавляет извлечение позиции игрока из заголовка таблицы"""
+        header = table.select("div.lineupTable__title")
+        if not header:
+            return None
+        text = header[0].text.strip().lower()
+        if "goalkeeper" in text:
+            return "goalkeeper"
+        if "defender" in text:
+            return "defender"
+        if "forward" in text:
+            return "forward"
+        if "coach" in text:
+            return "coach"
+        return None
+
+    def _extract_players_from_table(
+        self, table, position: str, team: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Добавляет извлечение списка игроков из таблицы конкретной позиции"""
+        players = []
+        for row in table.select("div.lineupTable__row"):
+            player = {
+                "position": position,
+                "team_id": team["id"],
+                "number": self._extract_player_number(row),
+                **self._extract_player_info(row),
+            }
+            if player.get("fl_id"):
+                players.append(player)
+        return players
+
+    def _extract_player_number(self, row) -> Optional[int]:
+        """Добавляет извлечение игрового номера игрока"""
+        cell = row.select("div.lineupTable__cell.lineupTable__cell--jersey")
+        if not cell:
+            return None
+        text = cell[0].text.strip()
+        return int(text) if text.isdigit() else None
+
+
+    def _extract_player_info(self, row) -> Dict[str, Any]:
+        """Добавляет извлечение основной информации об игроке (имя, страна, id)"""
+        cell_wrap = row.select("div.lineupTable__cell.lineupTable__cell--player")
+        if not cell_wrap:
+            return {}
+        cell = cell_wrap[0]
+        link = cell.select("a")
+        if not link:
+            return {}
+        link = link[0]
+
+        country_id = self._extract_player_country(cell)
+        name, first_name, last_name = self._parse_player_name(link.text.strip())
+
+        return {
+            "name": name,
+            "first_name": first_name,
+            "last_name": last_name,
+            "fl_id": link["href"].split("/")[-2],
+            "fl_slug": link["href"].split("/")[-3],
+            "country_id": country_id,
+        }
+
+    def _extract_player_country(self, cell) -> Optional[int]:
+        """Добавляет извлечение идентификатора страны игрока"""
+        flag = cell.select("div.lineupTable__cell--flag")
+        if not flag:
+            return None
+        country_name = flag[0].get("title")
+        return self.country_lookup(country_name)
+
+    @staticmethod
+    def _parse_player_name(name: str) -> tuple[str, Optional[str], Optional[str]]:
+        """Добавляет парсинг полного имени игрока на краткую форму и отдельные части"""
+        if name.count(" ") == 1:
+            last, first = name.split()
+            return f"{first[0]}. {last}", first, last
+        return name, None, None
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlExtractor(SoupExtractor):
+    """
+    Разбор через дерево lxml и XPath.
+
+    Страница разбирается парсером libxml2 (тем же, что у BeautifulSoup с
+    "lxml"), но без обёрток bs4; таблицы ищутся только внутри
+    div#overall-all-table. Комментарии и script в дерево как разметка не
+    попадают, поэтому результат совпадает с SoupExtractor.
+    """
+
+    name = "lxml"
+    _FLAG_SPAN = f"(//span[{_has_class('breadcrumb__flag')}])[1]"
+    _TABLES = f"//div[@id='overall-all-table']//div[{_has_class('lineupTable')}]"
+    _TITLE = f".//div[{_has_class('lineupTable__title')}]"
+    _ROWS = f".//div[{_has_class('lineupTable__row')}]"
+    _JERSEY = f".//div[{_has_class('lineupTable__cell')} and {_has_class('lineupTable__cell--jersey')}]"
+    _PLAYER = f".//div[{_has_class('lineupTable__cell')} and {_has_class('lineupTable__cell--player')}]"
+    _FLAG = f".//div[{_has_class('lineupTable__cell--flag')}]"
+
+    def extract(self, html: str, team: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        try:
+            root = lxml_html.document_fromstring(html)
+        except etree.ParserError:
+            # Пустой документ: у BeautifulSoup это страница без флага и таблиц
+            return True, []
+        is_club = self._determine_if_club(root)
+        players: List[Dict[str, Any]] = []
+        for table in root.xpath(self._TABLES):
+            position = self._get_position_from_table(table)
+            if position == "coach":
+                continue
+            players.extend(self._extract_players_from_table(table, position, team))
+        return is_club, players
+
+    def _determine_if_club(self, root) -> bool:
+        flag = self._first(root, self._FLAG_SPAN)
+        if flag is None:
+            return True
+        return not any(cls in self.NATIONAL_TEAM_FLAGS for cls in flag.get("class", "").split())
+
+    @staticmethod
+    def _first(node, path: str):
+        found = node.xpath(path)
+        return found[0] if found else None
+
+    def _get_position_from_table(self, table) -> Optional[str]:
+        header = self._first(table, self._TITLE)
+        if header is None:
+            return None
+        text = header.text_content().strip().lower()
+        for position in ("goalkeeper", "defender", "forward", "coach"):
+            if position in text:
+                return position
+        return None
+
+    def _extract_players_from_table(
+        self, table, position: str, team: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        players = []
+        for row in table.xpath(self._ROWS):
+            player = {
+                "position": position,
+                "team_id": team["id"],
+                "number": self._extract_player_number(row),
+                **self._extract_player_info(row),
+            }
+            if player.get("fl_id"):
+                players.append(player)
+        return players
+
+    def _extract_player_number(self, row) -> Optional[int]:
+        cell = self._first(row, self._JERSEY)
+        if cell is None:
+            return None
+        text = cell.text_content().strip()
+        return int(text) if text.isdigit() else None
+
+    def _extract_player_info(self, row) -> Dict[str, Any]:
+        cell = self._first(row, self._PLAYER)
+        if cell is None:
+            return {}
+        link = self._first(cell, ".//a")
+        if link is None:
+            return {}
+
+        country_id = self._extract_player_country(cell)
+        name, first_name, last_name = self._parse_player_name(link.text_content().strip())
+        href = link.attrib["href"]
+
+        return {
+            "name": name,
+            "first_name": first_name,
+            "last_name": last_name,
+            "fl_id": href.split("/")[-2],
+            "fl_slug": href.split("/")[-3],
+            "country_id": country_id,
+        }
+
+    def _extract_player_country(self, cell) -> Optional[int]:
+        flag = self._first(cell, self._FLAG)
+        if flag is None:
+            return None
+        return self.country_lookup(flag.get("title"))
+
+
+EXTRACTORS = {
+    "soup": SoupExtractor,
+    "lxml": LxmlExtractor,
+}
+
+
+def make_extractor(name: str, country_lookup: CountryLookup) -> SoupExtractor:
+    """Создаёт бэкенд разбора по имени из настроек (EXTRACTOR=soup|lxml)."""
+    try:
+        return EXTRACTORS[name](country_lookup)
+    except KeyError:
+        raise ValueError(f"Неизвестный EXTRACTOR={name!r}, доступны: {', '.join(EXTRACTORS)}") from None
+
+
+# Экземпляры бэкендов внутри процесса пула разбора, по одному на имя
+_worker_extractors: Dict[str, SoupExtractor] = {}
+
+
+def _keep_title(title: Optional[str]) -> Optional[str]:
+    return title
+
+
+def extract_in_worker(name: str, html: str, team_id: int) -> Tuple[bool, List[Dict[str, Any]]]:
+    """
+    Разбор страницы в процессе пула (PARSE_PROCESSES): справочника стран
+    там нет, поэтому вместо country_id игрок несёт название флага в
+    country_title — его переводит в id основной процесс.
+    """
+    extractor = _worker_extractors.get(name)
+    if extractor is None:
+        extractor = _worker_extractors[name] = make_extractor(name, _keep_title)
+    is_club, players = extractor.extract(html, {"id": team_id})
+    for player in players:
+        player["country_title"] = player.pop("country_id")
+    return is_club, players
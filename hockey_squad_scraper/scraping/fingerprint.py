@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Optional, Tuple
+
+# Открывающие/закрывающие div и span; комментарии, script и style
+# поглощаются целиком, чтобы теги внутри них не учитывались
+_TAGS = re.compile(
+    r"<(?:!--[^-]*(?:-(?!->)[^-]*)*(?:-->)?"
+    r"|(script|style)\b[^<]*(?:<(?!/\1)[^<]*)*(?:</\1\s*>)?"
+    r"|(/?)(div|span)\b[^>]*>)",
+    re.I,
+)
+_SECTION_ID = re.compile(r"""\bid\s*=\s*["']?overall-all-table["'\s>/]""", re.I)
+_FLAG_CLASS = re.compile(r"\bbreadcrumb__flag\b")
+_BETWEEN_TAGS = re.compile(r">\s+<")
+_SPACES = re.compile(r"\s+")
+
+
+def _flag_and_section(html: str) -> Tuple[str, Optional[str]]:
+    """
+    За один проход по тегам вне комментариев, script и style находит первый
+    span.breadcrumb__flag ("" — его нет) и разметку div#overall-all-table
+    (по балансу div, без построения DOM).
+    """
+    flag, section, depth, start = "", None, 0, 0
+    for tag in _TAGS.finditer(html):
+        name = tag.group(3)
+        if name is None:
+            continue
+        opening = not tag.group(2)
+        if name.lower() == "span":
+            if opening and not flag and _FLAG_CLASS.search(tag.group(0)):
+                flag = tag.group(0)
+                if section is not None:
+                    break
+        elif depth:
+            depth += 1 if opening else -1
+            if depth == 0:
+                section = html[start:tag.end()]
+                if flag:
+                    break
+        elif section is None and opening and _SECTION_ID.search(tag.group(0)):
+            depth, start = 1, tag.start()
+    if depth:
+        section = html[start:]
+    return flag, section
+
+
+def squad_fingerprint(html: str) -> Optional[str]:
+    """
+    Нормализованный хэш таблицы состава вместе с флагом в хлебных крошках
+    (от него зависит признак клуб/сборная). None, если таблицы на странице нет.
+    """
+    flag, section = _flag_and_section(html)
+    if section is None:
+        return None
+    digest = hashlib.sha1()
+    for part in (flag, section):
+        digest.update(_SPACES.sub(" ", _BETWEEN_TAGS.sub("><", part)).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import heapq
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class _TeamState:
+    team: Dict[str, Any]
+    interval: float
+    due: float
+    version: int = 0
+
+
+class TeamScheduler:
+    """
+    Очередь команд по времени следующей проверки.
+
+    Интервал каждой команды адаптируется к тому, как часто меняется её состав:
+    после изменений он сокращается вдвое, после проверки без изменений растёт
+    в полтора раза, оставаясь в пределах [min_interval, max_interval].
+    Сборные и команды приоритетных турниров проверяются в boost раз чаще.
+    """
+
+    SHRINK = 0.5
+    GROW = 1.5
+    JITTER = 0.1
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        *,
+        national_boost: float = 1.0,
+        competition_boost: float = 1.0,
+        boost_competitions: Iterable[int] = (),
+    ) -> None:
+        if not 0 < min_interval <= base_interval <= max_interval:
+            raise ValueError("Интервалы планировщика должны удовлетворять 0 < MIN <= base <= MAX")
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.national_boost = national_boost
+        self.competition_boost = competition_boost
+        self.boost_competitions: FrozenSet[int] = frozenset(boost_competitions)
+        self._states: Dict[int, _TeamState] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+
+    @classmethod
+    def from_settings(cls, cfg) -> "TeamScheduler":
+        return cls(
+            base_interval=cfg.main_loop_delay,
+            min_interval=cfg.scheduler_min_interval,
+            max_interval=cfg.scheduler_max_interval,
+            national_boost=cfg.scheduler_national_boost,
+            competition_boost=cfg.scheduler_competition_boost,
+            boost_competitions=cfg.scheduler_boost_competitions,
+        )
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def sync_teams(self, teams: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """Добавляет новые команды (к проверке сразу), убирает исчезнувшие, обновляет данные известных."""
+        now = time.monotonic() if now is None else now
+        seen = set()
+        for team in teams:
+            seen.add(team["id"])
+            state = self._states.get(team["id"])
+            if state is None:
+                self._states[team["id"]] = _TeamState(team=team, interval=self.base_interval, due=now)
+                self._push(team["id"])
+            else:
+                state.team = team
+        for team_id in set(self._states) - seen:
+            del self._states[team_id]
+
+    def pop_due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Извлекает все команды, срок проверки которых наступил."""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, team_id, version = heapq.heappop(self._heap)
+            state = self._states.get(team_id)
+            if state is not None and state.version == version:
+                due.append(state.team)
+        return due
+
+    def record(self, outcomes: Dict[int, Optional[bool]], now: Optional[float] = None) -> None:
+        """
+        Перепланирует команды по исходам проверки: True — состав менялся,
+        False — без изменений, None — ошибка (интервал не меняется).
+        """
+        now = time.monotonic() if now is None else now
+        for team_id, changed in outcomes.items():
+            state = self._states.get(team_id)
+            if state is None:
+                continue
+            if changed is True:
+                state.interval = max(self.min_interval, state.interval * self.SHRINK)
+            elif changed is False:
+                state.interval = min(self.max_interval, state.interval * self.GROW)
+            jitter = random.uniform(1 - self.JITTER, 1 + self.JITTER)
+            state.due = now + self._effective_interval(state) * jitter
+            self._push(team_id)
+
+    def requeue(self, teams: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """
+        Возвращает в очередь извлечённые команды, оставшиеся без исхода
+        (не захвачены в аренду или пакет упал), не меняя их интервал.
+        """
+        self.record(dict.fromkeys(team["id"] for team in teams), now)
+
+    def seconds_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        """Сколько секунд до ближайшей проверки (None — очередь пуста)."""
+        now = time.monotonic() if now is None else now
+        while self._heap:
+            due, team_id, version = self._heap[0]
+            state = self._states.get(team_id)
+            if state is not None and state.version == version:
+                return max(0.0, due - now)
+            heapq.heappop(self._heap)
+        return None
+
+    def _effective_interval(self, state: _TeamState) -> float:
+        boost = 1.0
+        if state.team.get("is_national"):
+            boost *= self.national_boost
+        if state.team.get("our_primary_competition") in self.boost_competitions:
+            boost *= self.competition_boost
+        return min(self.max_interval, max(self.min_interval, state.interval / boost))
+
+    def _push(self, team_id: int) -> None:
+        state = self._states[team_id]
+        state.version += 1
+        heapq.heappush(self._heap, (state.due, team_id, state.version))
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
 
-from typing import Dict, List, Set, Optional, Any
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import ContextManager, Dict, List, Set, Optional, Any, Tuple
 
-from bs4 import BeautifulSoup
 from tqdm import tqdm
 
 from hockey_squad_scraper.infrastructure.logger import logger
-from hockey_squad_scraper.infrastructure.http_client import HttpClient
+from hockey_squad_scraper.infrastructure.http_client import HttpClient, PermanentFetchError
 from hockey_squad_scraper.repositories.teams_repo import TeamsRepo
 from hockey_squad_scraper.repositories.countries_repo import CountriesRepo
 from hockey_squad_scraper.repositories.players_repo import PlayersRepo
+from hockey_squad_scraper.repositories.leases_repo import LeasesRepo
+from hockey_squad_scraper.repositories.journal_repo import JournalRepo
+from hockey_squad_scraper.repositories.checkpoints_repo import CheckpointsRepo
 from hockey_squad_scraper.infrastructure.db import DB
+from hockey_squad_scraper.infrastructure.fingerprints import FingerprintStore
+from hockey_squad_scraper.infrastructure.profiling import Profiler
+from hockey_squad_scraper.infrastructure.metrics import (
+    CYCLE_SECONDS,
+    DB_STATEMENTS,
+    PARSE_SECONDS,
+    TEAM_STATEMENTS,
+    TEAMS,
+)
+from hockey_squad_scraper.scraping.delta import ChangeEvent, ParsedSquad, SquadDelta
+from hockey_squad_scraper.scraping.extractors import NATIONAL_TEAM_FLAGS, extract_in_worker, make_extractor
+from hockey_squad_scraper.scraping.fingerprint import squad_fingerprint
 
 
 class SquadScraper:
@@ -20,23 +39,7 @@ class SquadScraper:
     синхронизирует составы с БД через PlayersRepo.
     """
 
-    NATIONAL_TEAM_FLAGS = {
-        "fl_02",
-        "fl_1",
-        "fl_2",
-        "fl_290",
-        "fl_292",
-        "fl_3",
-        "fl_4",
-        "fl_450",
-        "fl_451",
-        "fl_453",
-        "fl_5",
-        "fl_6",
-        "fl_7",
-        "fl_8",
-    }
-
+    NATIONAL_TEAM_FLAGS = NATIONAL_TEAM_FLAGS
 
     def __init__(
         self,
@@ -46,6 +49,11 @@ class SquadScraper:
         players_repo: PlayersRepo,
         countries_repo: CountriesRepo,
         cfg,
+        fingerprints: Optional[FingerprintStore] = None,
+        leases: Optional[LeasesRepo] = None,
+        profiler: Optional[Profiler] = None,
+        journal: Optional[JournalRepo] = None,
+        checkpoints: Optional[CheckpointsRepo] = None,
     ):
         """Добавляет инициализацию зависимостей и конфигурации"""
         self.db = db
@@ -54,189 +62,434 @@ class SquadScraper:
         self.players = players_repo
         self.countries = countries_repo
         self.cfg = cfg
+        self.fingerprints = fingerprints
+        self.leases = leases
+        self.profiler = profiler
+        self.journal = journal
+        self.checkpoints = checkpoints
+        self.extractor = make_extractor(cfg.extractor, self.countries.get_id)
+        self.cycles_done = 0
+        self.force_full_sync = True
+        self._fetch_pool: Optional[ThreadPoolExecutor] = None
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_broken = False
+        self._cycle_started: Optional[float] = None
+        self._cycle_id: Optional[int] = None
 
 
     def run_one_cycle(self) -> None:
         """Добавляет одиночный цикл парсинга всех команд и фиксации изменений"""
-        for team in tqdm(self.teams.list_teams(), desc="Teams"):
+        with self.profile_cycle("cycle"):
+            self.start_cycle()
+            teams = self.teams.list_teams()
+            if self.checkpoints is not None:
+                teams = self._resume_cycle(teams)
+            self.run_teams(teams)
+            if self._cycle_id is not None:
+                self.checkpoints.finish(self._cycle_id)
+                self._cycle_id = None
+            self.finish_cycle()
+
+    def _resume_cycle(self, teams: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Добавляет продолжение прерванного цикла по контрольной точке: остаются
+        команды, ещё не обработанные в нём успешно (упавшие пробуются снова)
+        """
+        self._cycle_id, done = self.checkpoints.start(len(teams))
+        if not done:
+            return teams
+        remaining = [team for team in teams if done.get(team["id"]) is None]
+        logger.info(
+            "Resuming cycle {}: {} teams done, {} left", self._cycle_id, len(teams) - len(remaining), len(remaining)
+        )
+        return remaining
+
+    def close(self) -> None:
+        """Добавляет остановку пулов загрузки и разбора, продления аренды и освобождение прокси"""
+        if self._fetch_pool is not None:
+            self._fetch_pool.shutdown(cancel_futures=True)
+            self._fetch_pool = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(cancel_futures=True)
+            self._parse_pool = None
+        if self.leases is not None:
+            self.leases.stop_heartbeat()
+        self.http.close()
+
+    def profile_cycle(self, label: str) -> ContextManager[None]:
+        """Добавляет профилирование блока, если оно запрошено флагом или сигналом"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.cycle(label)
+
+    def start_cycle(self) -> None:
+        """Добавляет подготовку цикла: периодическую сверку кэша и выбор полной синхронизации"""
+        self._cycle_started = time.monotonic()
+        self._maybe_reload_cache()
+        every = self.cfg.full_sync_every
+        self.force_full_sync = every <= 0 or self.cycles_done % every == 0
+
+    def finish_cycle(self) -> None:
+        """Добавляет завершение цикла и сохранение снимка кэша игроков"""
+        self.cycles_done += 1
+        if self._cycle_started is not None:
+            CYCLE_SECONDS.observe(time.monotonic() - self._cycle_started)
+            self._cycle_started = None
+        try:
+            self.players.save_snapshot()
+        except OSError as exc:
+            logger.warning("Players cache snapshot not saved: {}", exc)
+
+    def run_teams(self, teams: List[Dict[str, Any]]) -> Dict[int, Optional[bool]]:
+        """
+        Добавляет обработку набора команд: последовательно или конвейером,
+        где FETCH_WORKERS потоков качают и разбирают страницы, а запись в БД
+        выполняет только текущий поток. Возвращает исход по каждой команде:
+        True — состав изменился, False — без изменений, None — ошибка
+        """
+        outcomes: Dict[int, Optional[bool]] = {}
+        try:
+            if self.leases is None:
+                self._run_teams_inner(teams, outcomes)
+            else:
+                self._run_leased_teams(teams, outcomes)
+        finally:
+            if self.fingerprints is not None:
+                self.fingerprints.save()
+        return outcomes
+
+    def _run_leased_teams(
+        self, teams: List[Dict[str, Any]], outcomes: Dict[int, Optional[bool]]
+    ) -> None:
+        """Добавляет обработку только тех команд, которые удалось захватить в аренду, порциями"""
+        self.leases.register(team["id"] for team in teams)
+        batch = self.cfg.lease_batch or max(1, self.cfg.fetch_workers) * 4
+        for i in range(0, len(teams), batch):
+            chunk = teams[i:i + batch]
+            claimed = self.leases.claim(team["id"] for team in chunk)
             try:
-                self._process_team(team)
-            except Exception as exc:
-                logger.opt(exception=exc).warning("Team {} failed – skipped", team['id'])
+                self._run_teams_inner([team for team in chunk if team["id"] in claimed], outcomes)
+            finally:
+                self.leases.release(claimed - set(outcomes))
 
+    def _run_teams_inner(
+        self, teams: List[Dict[str, Any]], outcomes: Dict[int, Optional[bool]]
+    ) -> None:
+        """Добавляет последовательный или конвейерный обход команд"""
+        self._ensure_parse_pool()
+        if self.profiler is not None and any(self.profiler.wants_team(t["id"]) for t in teams):
+            profiled = [t for t in teams if self.profiler.wants_team(t["id"])]
+            teams = [t for t in teams if not self.profiler.wants_team(t["id"])]
+            # Профилируемые команды идут целиком в текущем потоке, чтобы в профиль попали и загрузка, и запись
+            for team in profiled:
+                outcomes[team["id"]] = None
+                try:
+                    with self.profiler.team(team["id"]):
+                        outcomes[team["id"]] = self._process_team(team)
+                except Exception as exc:
+                    self._log_team_failure(team, exc)
+                self._finish_team(team, outcomes[team["id"]])
+
+        workers = self.cfg.fetch_workers
+        if workers <= 1:
+            for team in tqdm(teams, desc="Teams"):
+                outcomes[team["id"]] = None
+                try:
+                    outcomes[team["id"]] = self._process_team(team)
+                except Exception as exc:
+                    self._log_team_failure(team, exc)
+                self._finish_team(team, outcomes[team["id"]])
+            return
+
+        if self._fetch_pool is None:
+            # Потоки живут между циклами: каждый держит свой прокси и keep-alive сессию
+            self._fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        futures = {self._fetch_pool.submit(self._fetch_squad, team): team for team in teams}
+        try:
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Teams"):
+                team = futures[future]
+                outcomes[team["id"]] = None
+                try:
+                    outcomes[team["id"]] = self._sync_team(team, future.result())
+                except Exception as exc:
+                    self._log_team_failure(team, exc)
+                self._finish_team(team, outcomes[team["id"]])
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _ensure_parse_pool(self) -> None:
+        """Добавляет создание (или пересоздание после падения воркера) пула процессов разбора"""
+        if self.cfg.parse_processes <= 0:
+            return
+        if self._parse_pool is not None and not self._parse_pool_broken:
+            return
+        if self._parse_pool is not None:
+            logger.warning("Parse process pool broken – restarting")
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+        # spawn, а не fork: к этому моменту уже работают потоки загрузки и логгера
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=self.cfg.parse_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._parse_pool_broken = False
 
-    def _process_team(self, team: Dict[str, Any]) -> None:
+    @staticmethod
+    def _log_team_failure(team: Dict[str, Any], exc: Exception) -> None:
+        """Добавляет запись об ошибке команды: постоянные ответы сайта — без трассировки"""
+        if isinstance(exc, PermanentFetchError):
+            logger.warning("Team {} page unavailable ({}) – skipped", team["id"], exc.status)
+        else:
+            logger.opt(exception=exc).warning("Team {} failed – skipped", team["id"])
+
+    def _record_team_done(self, team: Dict[str, Any], outcome: Optional[bool]) -> None:
+        """Добавляет служебные отметки об обработанной команде в текущую транзакцию"""
+        if self.leases is not None:
+            self.leases.complete(team["id"])
+        if self._cycle_id is not None:
+            self.checkpoints.record(self._cycle_id, team["id"], outcome)
+
+    def _finish_team(self, team: Dict[str, Any], outcome: Optional[bool]) -> None:
+        """
+        Добавляет фиксацию служебных отметок для команд без записанных изменений
+        (для изменённых они уже записаны в транзакции состава)
+        """
+        TEAMS.inc(outcome={True: "changed", False: "unchanged", None: "failed"}[outcome])
+        if outcome is True or (self.leases is None and self._cycle_id is None):
+            return
+        try:
+            with self.db.transaction():
+                self._record_team_done(team, outcome)
+        except Exception as exc:
+            logger.opt(exception=exc).warning("Team {} bookkeeping failed", team["id"])
+
+    def _maybe_reload_cache(self) -> None:
+        """
+        Периодическая сверка кэша игроков с БД: раз в CACHE_RELOAD_EVERY циклов
+        полной перезагрузкой, в остальных — дочитыванием изменённых строк
+        (CACHE_DELTA_REFRESH=cycle|team)
+        """
+        every = self.cfg.cache_reload_every
+        if every > 0 and self.cycles_done and self.cycles_done % every == 0:
+            logger.info("Full players cache reload (cycle {})", self.cycles_done)
+            self.players.refresh_cache()
+        elif self.cfg.cache_delta_refresh in ("cycle", "team") and self.cycles_done:
+            changed = self.players.refresh_changed()
+            logger.info("Players cache delta refresh: {} rows changed", changed)
+
+
+    def _process_team(self, team: Dict[str, Any]) -> bool:
         """Добавляет полный процесс обработки одной команды: загрузка HTML, синхронизация игроков"""
-        url = f"https://www.flashscore.com/team/{team['fl_slug']}/{team['fl_id']}/squad/"
+        return self._sync_team(team, self._fetch_squad(team))
+
+    def _fetch_squad(self, team: Dict[str, Any]) -> Optional[ParsedSquad]:
+        """
+        Добавляет загрузку и разбор страницы состава без обращений к БД (безопасно для потоков).
+        Возвращает None, если отпечаток таблицы совпал с последней успешной синхронизацией
+        """
+        url = f"{self.cfg.flashscore_base_url}/team/{team['fl_slug']}/{team['fl_id']}/squad/"
         logger.debug("Scrapping: {}", url)
-        self.any_updates = False
-
-        soup = BeautifulSoup(self.http.get(url), "lxml")
-
-        is_club = self._determine_if_club(soup)
-        self._update_team_national_status(team, is_club)
-
+        html = self.http.get(url, team_id=team["id"])
+
+        fingerprint = None
+        if self.fingerprints is not None:
+            fingerprint = squad_fingerprint(html)
+            if (
+                not self.force_full_sync
+                and fingerprint is not None
+                and self.fingerprints.get(team["id"]) == fingerprint
+            ):
+                logger.debug("Squad of team {} unchanged – skipped", team["id"])
+                return None
+
+        with PARSE_SECONDS.time(backend=self.extractor.name):
+            is_club, players = self._extract(html, team)
+        return ParsedSquad(is_club=is_club, players=players, fingerprint=fingerprint)
+
+    def _extract(self, html: str, team: Dict[str, Any]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Добавляет разбор страницы в пуле процессов, если он включён (PARSE_PROCESSES),
+        иначе — в текущем потоке; названия стран переводятся в id здесь, в основном процессе
+        """
+        pool = self._parse_pool
+        if pool is None or self._parse_pool_broken:
+            return self.extractor.extract(html, team)
+        try:
+            is_club, players = pool.submit(extract_in_worker, self.extractor.name, html, team["id"]).result()
+        except BrokenProcessPool:
+            self._parse_pool_broken = True
+            logger.warning("Parse worker died on team {} – parsing in thread", team["id"])
+            return self.extractor.extract(html, team)
+        for player in players:
+            player["country_id"] = self.countries.get_id(player.pop("country_title"))
+        return is_club, players
+
+    def _sync_team(self, team: Dict[str, Any], parsed: Optional[ParsedSquad]) -> bool:
+        """Добавляет синхронизацию разобранного состава с кэшем и БД; True, если что-то записано"""
+        if parsed is None:
+            return False
+        statements = DB_STATEMENTS.total()
+        try:
+            if self.cfg.cache_delta_refresh == "team":
+                # Число строк таблицы сверяется только в начале цикла: COUNT(*) на каждую команду дорог
+                self.players.refresh_changed(check_deletions=False)
+            delta = self._build_delta(team, parsed.is_club, parsed.players)
+            changed = self._apply_delta(team, delta)
+        except Exception:
+            if self.fingerprints is not None:
+                self.fingerprints.discard(team["id"])
+            raise
+        finally:
+            TEAM_STATEMENTS.observe(DB_STATEMENTS.total() - statements)
+        if self.fingerprints is not None:
+            self.fingerprints.set(team["id"], parsed.fingerprint)
+        return changed
+
+    def _build_delta(
+        self, team: Dict[str, Any], is_club: bool, players: List[Dict[str, Any]]
+    ) -> SquadDelta:
+        """Сравнивает состав со страницы с кэшем и собирает пакет изменений без записи в БД"""
+        delta = SquadDelta(team_id=team["id"], is_club=is_club)
         current_ids = self._get_current_squad_ids(team["id"], is_club)
-        actual_ids: Set[int] = set()
-
-
-        for table in soup.select("div#overall-all-table div.lineupTable"):
-            position = self._get_position_from_table(table)
-            if position == "coach":
-                continue
-            for pdata in self._extract_players_from_table(table, position, team):
-                pid = self._process_player_record(pdata, team["id"], is_club)
-                if pid:
-                    actual_ids.add(pid)
-
-
-        self._remove_players_not_in_squad(current_ids, actual_ids, is_club)
+        existing = self.players.find_many_by_fl_id(p["fl_id"] for p in players)
 
+        actual_ids: Set[int] = set()
+        for pdata in players:
+            pid = self._process_player_record(pdata, existing.get(pdata["fl_id"]), delta)
+            if pid:
+                actual_ids.add(pid)
+
+        self._remove_players_not_in_squad(current_ids, actual_ids, delta)
+        return delta
+
+    def _apply_delta(self, team: Dict[str, Any], delta: SquadDelta) -> bool:
+        """Применяет пакет изменений команды несколькими запросами в одной транзакции"""
+        if delta.is_empty and not self._national_status_changed(team, delta.is_club):
+            return False
+
+        was_national = team["is_national"]
+        try:
+            with self.db.transaction():
+                self._update_team_national_status(team, delta.is_club)
+                inserted: Dict[str, int] = {}
+                if not delta.is_empty:
+                    inserted = self._write_delta(delta)
+                if self.journal is not None:
+                    self.journal.append(self._change_events(team, delta, was_national, inserted))
+                self._record_team_done(team, True)
+        except Exception:
+            # Транзакция откатена: статус команды в памяти — снова как в БД
+            team["is_national"] = was_national
+            self.players.reload_rows(
+                ids=set(delta.updates) | delta.removed, fl_ids=delta.inserts
+            )
+            raise
+
+        logger.info(
+            "Committed squad changes for team {} (updated {}, new {}, removed {})",
+            team["id"], len(delta.updates), len(delta.inserts), len(delta.removed),
+        )
+        return True
+
+    def _write_delta(self, delta: SquadDelta) -> Dict[str, int]:
+        """Добавляет пакетную запись изменений игроков, переводов и снятых связей; возвращает id новых игроков по fl_id"""
+        self.players.update_players(delta.updates)
+        ids: Dict[str, int] = {}
+        if delta.inserts:
+            ids = self.players.insert_players(list(delta.inserts.values()))
+            self.players.insert_translations([
+                (ids[fl_id], row["name"], row["first_name"], row["last_name"])
+                for fl_id, row in delta.inserts.items()
+            ])
+        self.players.clear_team_links(delta.removed, delta.link_field)
+        return ids
 
-        if self.any_updates:
-            self.db.conn.commit()
-            logger.info("Committed squad changes for team {}", team["id"])
+    def _change_events(
+        self,
+        team: Dict[str, Any],
+        delta: SquadDelta,
+        was_national: int,
+        inserted: Dict[str, int],
+    ) -> List[ChangeEvent]:
+        """Добавляет сборку событий журнала по применённому пакету изменений"""
+        events: List[ChangeEvent] = []
+        if team["is_national"] != was_national:
+            events.append(ChangeEvent(
+                ChangeEvent.NATIONAL_FLIP, team["id"],
+                payload={"is_national": team["is_national"]},
+            ))
+        for pid, previous in delta.transfers.items():
+            row = self.players.cache.get(pid) or {}
+            events.append(ChangeEvent(
+                ChangeEvent.TRANSFER, delta.team_id, pid,
+                payload={"fl_id": row.get("fl_id"), "field": delta.link_field,
+                         "from": previous, "to": delta.team_id},
+            ))
+        for fl_id, row in delta.inserts.items():
+            events.append(ChangeEvent(
+                ChangeEvent.NEW_PLAYER, delta.team_id, inserted.get(fl_id),
+                payload={"fl_id": fl_id, "name": row["name"], "field": delta.link_field,
+                         "position": row["position"], "number": row["number"],
+                         "country_id": row["country_id"]},
+            ))
+        for pid in sorted(delta.removed):
+            row = self.players.cache.get(pid) or {}
+            events.append(ChangeEvent(
+                ChangeEvent.REMOVAL, delta.team_id, pid,
+                payload={"fl_id": row.get("fl_id"), "field": delta.link_field},
+            ))
+        return events
 
 
-    def _determine_if_club(self, soup: BeautifulSoup) -> bool:
-        """Добавляет определение, является ли команда клубом или сборной"""
-        flag_spans = soup.select("span.breadcrumb__flag")
-        if not flag_spans:
-            return True
-        classes = flag_spans[0].get("class", [])
-        return not any(cls in self.NATIONAL_TEAM_FLAGS for cls in classes)
+    @staticmethod
+    def _national_status_changed(team: Dict[str, Any], is_club: bool) -> bool:
+        """Добавляет проверку, расходится ли статус клуб/сборная с записанным в БД"""
+        return (is_club and team["is_national"] == 1) or (not is_club and team["is_national"] == 0)
 
     def _update_team_national_status(self, team: Dict[str, Any], is_club: bool) -> None:
         """Добавляет обновление статуса команды (клуб/сборная) в базе данных"""
         if is_club and team["is_national"] == 1:
             sql = "UPDATE hockey_teams SET is_national=0, updated_at=NOW() WHERE id=%s"
+            DB_STATEMENTS.inc(op="update_team")
             self.db.cur.execute(sql, (team["id"],))
-            self.any_updates = True
             team["is_national"] = 0
         elif not is_club and team["is_national"] == 0:
             sql = "UPDATE hockey_teams SET is_national=1, updated_at=NOW() WHERE id=%s"
+            DB_STATEMENTS.inc(op="update_team")
             self.db.cur.execute(sql, (team["id"],))
-            self.any_updates = True
             team["is_national"] = 1
 
 
-    def _get_position_from_table(self, table) -> Optional[str]:
-        """Добавляет извлечение позиции игрока из заголовка таблицы"""
-        header = table.select("div.lineupTable__title")
-        if not header:
-            return None
-        text = header[0].text.strip().lower()
-        if "goalkeeper" in text:
-            return "goalkeeper"
-        if "defender" in text:
-            return "defender"
-        if "forward" in text:
-            return "forward"
-        if "coach" in text:
-            return "coach"
-        return None
-
-    def _extract_players_from_table(
-        self, table, position: str, team: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Добавляет извлечение списка игроков из таблицы конкретной позиции"""
-        players = []
-        for row in table.select("div.lineupTable__row"):
-            player = {
-                "position": position,
-                "team_id": team["id"],
-                "number": self._extract_player_number(row),
-                **self._extract_player_info(row),
-            }
-            if player.get("fl_id"):
-                players.append(player)
-        return players
-
-    def _extract_player_number(self, row) -> Optional[int]:
-        """Добавляет извлечение игрового номера игрока"""
-        cell = row.select("div.lineupTable__cell.lineupTable__cell--jersey")
-        if not cell:
-            return None
-        text = cell[0].text.strip()
-        return int(text) if text.isdigit() else None
-
-
-    def _extract_player_info(self, row) -> Dict[str, Any]:
-        """Добавляет извлечение основной информации об игроке (имя, страна, id)"""
-        cell_wrap = row.select("div.lineupTable__cell.lineupTable__cell--player")
-        if not cell_wrap:
-            return {}
-        cell = cell_wrap[0]
-        link = cell.select("a")
-        if not link:
-            return {}
-        link = link[0]
-
-        country_id = self._extract_player_country(cell)
-        name, first_name, last_name = self._parse_player_name(link.text.strip())
-
-        return {
-            "name": name,
-            "first_name": first_name,
-            "last_name": last_name,
-            "fl_id": link["href"].split("/")[-2],
-            "fl_slug": link["href"].split("/")[-3],
-            "country_id": country_id,
-        }
-
-    def _extract_player_country(self, cell) -> Optional[int]:
-        """Добавляет извлечение идентификатора страны игрока"""
-        flag = cell.select("div.lineupTable__cell--flag")
-        if not flag:
-            return None
-        country_name = flag[0].get("title")
-        return self.countries.get_id(country_name)
-
-    @staticmethod
-    def _parse_player_name(name: str) -> tuple[str, Optional[str], Optional[str]]:
-        """Добавляет парсинг полного имени игрока на краткую форму и отдельные части"""
-        if name.count(" ") == 1:
-            last, first = name.split()
-            return f"{first[0]}. {last}", first, last
-        return name, None, None
-
-
     def _get_current_squad_ids(self, team_id: int, is_club: bool) -> Set[int]:
         """Добавляет получение текущего набора ID игроков команды из кеша"""
-        ids: Set[int] = set()
-        for pid, p in self.players.cache.items():
-            if is_club and p["team_id"] == team_id:
-                ids.add(pid)
-            elif not is_club and p["national_team_id"] == team_id:
-                ids.add(pid)
-        return ids
+        return self.players.squad_ids(team_id, is_club)
 
     def _process_player_record(
-        self, pdata: Dict[str, Any], team_id: int, is_club: bool
+        self,
+        pdata: Dict[str, Any],
+        existing: Optional[Dict[str, Any]],
+        delta: SquadDelta,
     ) -> Optional[int]:
         """Добавляет обработку записи игрока: обновление или создание"""
-        existing = self.players.find_by_fl_id(pdata["fl_id"])
         if existing:
-            return self._update_existing_player(existing, pdata, team_id, is_club)
-        return self._create_new_player(pdata, team_id, is_club)
+            return self._update_existing_player(existing, pdata, delta)
+        self._create_new_player(pdata, delta)
+        return None
 
 
     def _update_existing_player(
         self,
         player: Dict[str, Any],
         new: Dict[str, Any],
-        team_id: int,
-        is_club: bool,
+        delta: SquadDelta,
     ) -> int:
-        """Добавляет обновление существующего игрока в репозитории"""
+        """Добавляет обновление существующего игрока в пакет изменений"""
         pid = player["id"]
         fields: Dict[str, Any] = {}
 
 
-        if is_club and player["team_id"] != team_id:
-            fields["team_id"] = team_id
-        elif not is_club and player["national_team_id"] != team_id:
-            fields["national_team_id"] = team_id
+        if player[delta.link_field] != delta.team_id:
+            delta.add_transfer(pid, player[delta.link_field])
 
 
         for f in ("position", "number", "country_id", "first_name", "last_name"):
@@ -244,14 +497,11 @@ class SquadScraper:
                 fields[f] = new[f]
 
         if fields:
-            self.players.update_player(pid, fields)
-            self.any_updates = True
+            delta.add_update(pid, fields)
         return pid
 
-    def _create_new_player(
-        self, pdata: Dict[str, Any], team_id: int, is_club: bool
-    ) -> int:
-        """Добавляет создание нового игрока и его переводов в репозитории"""
+    def _create_new_player(self, pdata: Dict[str, Any], delta: SquadDelta) -> None:
+        """Добавляет создание нового игрока (и его перевода) в пакет изменений"""
         base = {
             "name": pdata["name"],
             "fl_id": pdata["fl_id"],
@@ -261,24 +511,14 @@ class SquadScraper:
             "fl_slug": pdata["fl_slug"],
             "first_name": pdata["first_name"],
             "last_name": pdata["last_name"],
-            "team_id": team_id if is_club else None,
-            "national_team_id": None if is_club else team_id,
+            "team_id": delta.team_id if delta.is_club else None,
+            "national_team_id": None if delta.is_club else delta.team_id,
         }
-
-        pid = self.players.insert_player(base)
-        self.players.insert_translation(
-            pid, pdata["name"], pdata["first_name"], pdata["last_name"]
-        )
-        self.any_updates = True
-        return pid
+        delta.add_insert(base)
 
 
     def _remove_players_not_in_squad(
-        self, current_ids: Set[int], actual_ids: Set[int], is_club: bool
+        self, current_ids: Set[int], actual_ids: Set[int], delta: SquadDelta
     ) -> None:
-        """Добавляет удаление игроков, которых больше нет в составе на Flashscore"""
-        diff = current_ids - actual_ids
-        field = "team_id" if is_club else "national_team_id"
-        for pid in diff:
-            self.players.clear_team_link(pid, field)
-            self.any_updates = True
+        """Добавляет снятие игроков, которых больше нет в составе на Flashscore"""
+        delta.removed |= current_ids - actual_ids
@@ -0,0 +1,5 @@
+import os
+
+# Settings читает окружение при импорте; в .env они обязательны
+os.environ.setdefault("INITIAL_DELAY_MIN", "0")
+os.environ.setdefault("INITIAL_DELAY_MAX", "0")
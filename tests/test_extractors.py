@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.pages import make_squad, render_squad_page
+from benchmarks.run import load_fixtures
+from hockey_squad_scraper.scraping.extractors import LxmlExtractor, SoupExtractor
+from hockey_squad_scraper.scraping.fingerprint import squad_fingerprint
+
+TEAM = {"id": 1}
+SECTION = '<div id="overall-all-table" class="lineup">'
+FLAG = '<span class="breadcrumb__flag flag fl_39"></span>'
+NATIONAL_FLAG = '<span class="breadcrumb__flag flag fl_8"></span>'
+
+
+def page(flag: str = "fl_39", seed: int = 1) -> str:
+    return render_squad_page(make_squad(seed), flag, padding_kb=1)
+
+
+def edge_cases():
+    club = page()
+    return {
+        "empty": "",
+        "no_lineup": "<html><body><p>nothing here</p></body></html>",
+        "flag_in_comment": club.replace(FLAG, f"<!-- {NATIONAL_FLAG} -->{FLAG}"),
+        "flag_in_script": club.replace(FLAG, f"<script>var f = '{NATIONAL_FLAG}';</script>{FLAG}"),
+        "only_flag_in_comment": club.replace(FLAG, f"<!-- {NATIONAL_FLAG} -->"),
+        "closing_div_in_comment": club.replace(
+            '<div class="lineupTable__row">', '<!-- </div></div> --><div class="lineupTable__row">', 1
+        ),
+        "table_in_script": club.replace(
+            SECTION,
+            SECTION + "<script>document.write('<div class=\"lineupTable\"><div class=\"lineupTable__title\">"
+            "Forwards</div><div class=\"lineupTable__row\"><div class=\"lineupTable__cell lineupTable__cell--player\">"
+            "<a href=\"/player/x/ghost/\">Ghost Player</a></div></div></div>');</script>",
+        ),
+        "lineup_in_comment": club.replace(SECTION, f"<!-- {SECTION}</div> -->{SECTION}"),
+    }
+
+
+def all_pages():
+    return {**load_fixtures(), **edge_cases()}
+
+
+@pytest.mark.parametrize("name", sorted(all_pages()))
+def test_lxml_matches_soup(name):
+    html = all_pages()[name]
+    lookup = lambda title: title
+    assert LxmlExtractor(lookup).extract(html, TEAM) == SoupExtractor(lookup).extract(html, TEAM)
+
+
+def test_flag_outside_markup_decides_national_status():
+    for html in (edge_cases()["flag_in_comment"], edge_cases()["flag_in_script"]):
+        assert LxmlExtractor(lambda title: title).extract(html, TEAM)[0] is True
+
+
+def test_fingerprint_ignores_closing_div_in_comment():
+    html = edge_cases()["closing_div_in_comment"]
+    changed = html.replace("lineupTable__cell--jersey\">", "lineupTable__cell--jersey\">9", 5)
+    assert squad_fingerprint(html) != squad_fingerprint(changed)
+
+
+def test_fingerprint_ignores_flag_in_comment():
+    club = page()
+    national = club.replace(FLAG, NATIONAL_FLAG)
+    assert squad_fingerprint(club) != squad_fingerprint(national)
+    assert squad_fingerprint(club.replace(FLAG, f"<!-- {NATIONAL_FLAG} -->{FLAG}")) == squad_fingerprint(
+        club.replace(FLAG, f"<!-- {FLAG} -->{FLAG}")
+    )
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from hockey_squad_scraper.infrastructure.http_client import (
+    PERMANENT,
+    RATE_LIMITED,
+    SERVER,
+    classify_status,
+    parse_retry_after,
+)
+
+
+@pytest.mark.parametrize("status, kind", [
+    (429, RATE_LIMITED),
+    (503, RATE_LIMITED),
+    (408, SERVER),
+    (500, SERVER),
+    (502, SERVER),
+    (504, SERVER),
+    (400, PERMANENT),
+    (403, PERMANENT),
+    (404, PERMANENT),
+    (410, PERMANENT),
+])
+def test_classify_status(status, kind):
+    assert classify_status(status) == kind
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("120", 120.0),
+    (" 5 ", 5.0),
+    ("0", 0.0),
+    ("-1", None),
+    ("1.5", None),
+    ("soon", None),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    moment = datetime.now(timezone.utc) + timedelta(seconds=90)
+    assert 85 <= parse_retry_after(format_datetime(moment, usegmt=True)) <= 90
@@ -0,0 +1,49 @@
+import multiprocessing
+
+from hockey_squad_scraper.infrastructure.page_archive import PageArchive
+
+PAGES = 60
+
+
+def page(writer: int, n: int) -> str:
+    return f"<html>{writer}:{n}</html>" + "x" * (n * 37 % 500)
+
+
+def write_pages(directory: str, writer: int) -> None:
+    archive = PageArchive(directory, segment_size=4096)
+    for n in range(PAGES):
+        archive.append(writer * 1000 + n, f"https://example.com/{writer}/{n}", page(writer, n), ts=n)
+    archive.close()
+
+
+def check(directory) -> None:
+    archive = PageArchive(directory)
+    assert len(archive.team_ids()) == 2 * PAGES
+    for writer in (1, 2):
+        for n in range(PAGES):
+            (entry,) = archive.history(writer * 1000 + n)
+            assert archive.read(entry) == page(writer, n)
+    indexed = {team_id: archive.history(team_id) for team_id in archive.team_ids()}
+    archive.rebuild_index()
+    assert {team_id: archive.history(team_id) for team_id in archive.team_ids()} == indexed
+
+
+def test_two_processes_append_to_one_directory(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    writers = [ctx.Process(target=write_pages, args=(str(tmp_path), w)) for w in (1, 2)]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join()
+        assert process.exitcode == 0
+    assert len(list(tmp_path.glob("pages-*.seg"))) > 1
+    check(tmp_path)
+
+
+def test_two_instances_interleaved_in_one_process(tmp_path):
+    first = PageArchive(tmp_path, segment_size=4096)
+    second = PageArchive(tmp_path, segment_size=4096)
+    for n in range(PAGES):
+        first.append(1000 + n, f"https://example.com/1/{n}", page(1, n), ts=n)
+        second.append(2000 + n, f"https://example.com/2/{n}", page(2, n), ts=n)
+    check(tmp_path)
@@ -0,0 +1,89 @@
+from benchmarks.fakedb import FakeDB
+from hockey_squad_scraper.repositories.players_repo import PlayersRepo
+
+
+def make_repo(*rows) -> PlayersRepo:
+    db = FakeDB()
+    db.conn.executemany(
+        "INSERT INTO hockey_players (id, name, fl_id, team_id, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+        rows,
+    )
+    db.conn.commit()
+    return PlayersRepo(db)
+
+
+def test_duplicate_fl_id_resolves_to_lowest_id():
+    repo = make_repo((9, "B", "dup", 2), (5, "A", "dup", 1))
+    assert repo.find_by_fl_id("dup").id == 5
+    assert repo.find_many_by_fl_id(["dup"])["dup"].id == 5
+
+
+def test_duplicate_fl_id_is_stable_across_patches():
+    repo = make_repo((5, "A", "dup", 1), (9, "B", "dup", 2))
+    repo._put_row(repo.cache[9].replace({"team_id": 3}))
+    repo._put_row(repo.cache[5].replace({"team_id": 4}))
+    repo._put_row(repo.cache[9].replace({"team_id": 5}))
+    row = repo.find_by_fl_id("dup")
+    assert (row.id, row.team_id) == (5, 4)
+
+
+def test_dropping_indexed_duplicate_promotes_the_next_one():
+    repo = make_repo((5, "A", "dup", 1), (9, "B", "dup", 2), (7, "C", "dup", 3))
+    repo._drop_row(5)
+    assert repo._by_fl_id["dup"].id == 7
+    repo._drop_row(7)
+    assert repo._by_fl_id["dup"].id == 9
+    repo._drop_row(9)
+    assert "dup" not in repo._by_fl_id
+
+
+def test_db_fallback_matches_cache_for_duplicates():
+    repo = make_repo((9, "B", "dup", 2), (5, "A", "dup", 1))
+    repo._drop_row(5)
+    repo._drop_row(9)
+    assert repo.find_by_fl_id("dup").id == 5
+
+
+def test_refresh_changed_loads_rows_older_than_watermark():
+    repo = make_repo((5, "A", "a", 1))
+    repo.db.conn.execute(
+        "INSERT INTO hockey_players (id, name, fl_id, team_id, updated_at) VALUES (6, 'B', 'b', 1, '2000-01-01 00:00:00')"
+    )
+    repo.db.conn.commit()
+    repo.refresh_changed()
+    assert repo.find_by_fl_id("b").id == 6
+    assert repo.squad_ids(1, is_club=True) == {5, 6}
+
+
+def test_refresh_changed_drops_deleted_rows():
+    repo = make_repo((5, "A", "a", 1), (6, "B", "b", 1))
+    repo.db.conn.execute("DELETE FROM hockey_players WHERE id = 6")
+    repo.db.conn.commit()
+    repo.refresh_changed()
+    assert set(repo.cache) == {5}
+    assert "b" not in repo._by_fl_id
+
+
+def test_update_players_writes_each_row_its_own_values():
+    repo = make_repo((5, "A", "a", 1), (6, "B", "b", 1), (7, "C", "c", 1))
+    repo.update_players({5: {"team_id": 2, "number": 10}, 6: {"number": 11}, 7: {}})
+    rows = repo.db.conn.execute("SELECT id, team_id, number FROM hockey_players ORDER BY id").fetchall()
+    assert [tuple(r) for r in rows] == [(5, 2, 10), (6, 1, 11), (7, 1, None)]
+    assert (repo.cache[5].team_id, repo.cache[5].number, repo.cache[6].number) == (2, 10, 11)
+
+
+def test_insert_players_returns_ids_and_keeps_column_defaults():
+    repo = make_repo((5, "A", "a", 1))
+    ids = repo.insert_players([
+        {"name": "B", "fl_id": "b", "team_id": 1, "number": 7},
+        {"name": "C", "fl_id": "c", "team_id": 1, "number": None},
+        {"name": "D", "fl_id": "d", "team_id": 2, "number": 9},
+    ])
+    rows = {
+        r[0]: tuple(r[1:])
+        for r in repo.db.conn.execute("SELECT fl_id, id, team_id, number FROM hockey_players WHERE id != 5")
+    }
+    assert ids == {fl_id: row[0] for fl_id, row in rows.items()}
+    assert {fl_id: row[1:] for fl_id, row in rows.items()} == {"b": (1, 7), "c": (1, None), "d": (2, 9)}
+    assert repo.find_by_fl_id("c").id == ids["c"]
+    assert repo.squad_ids(1, is_club=True) == {5, ids["b"], ids["c"]}
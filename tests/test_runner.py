@@ -0,0 +1,26 @@
+import dataclasses
+
+import pytest
+
+from hockey_squad_scraper import runner
+from hockey_squad_scraper.infrastructure.config import Settings
+
+
+def settings(**overrides) -> Settings:
+    return dataclasses.replace(Settings(), **{"scheduler": "sweep", **overrides})
+
+
+def test_checkpoints_with_sharding_require_explicit_worker_id():
+    cfg = settings(checkpoints=True, sharding=True, worker_id="host", worker_id_explicit=False)
+    with pytest.raises(ValueError, match="WORKER_ID"):
+        runner._check_settings(cfg, runner._parse_args([]))
+
+
+@pytest.mark.parametrize("overrides, argv", [
+    ({"checkpoints": True, "sharding": True, "worker_id": "host-a", "worker_id_explicit": True}, []),
+    ({"checkpoints": True, "sharding": False, "worker_id_explicit": False}, []),
+    ({"checkpoints": True, "sharding": True, "worker_id_explicit": False, "scheduler": "adaptive"}, []),
+    ({"checkpoints": True, "sharding": True, "worker_id_explicit": False}, ["--replay"]),
+])
+def test_allowed_checkpoint_settings(overrides, argv):
+    runner._check_settings(settings(**overrides), runner._parse_args(argv))
@@ -0,0 +1,100 @@
+import pytest
+
+from hockey_squad_scraper.scraping.scheduler import TeamScheduler
+
+
+def make_scheduler(**kwargs) -> TeamScheduler:
+    scheduler = TeamScheduler(base_interval=100, min_interval=10, max_interval=1000, **kwargs)
+    scheduler.JITTER = 0
+    return scheduler
+
+
+def team(team_id: int, **fields) -> dict:
+    return {"id": team_id, "is_national": 0, "our_primary_competition": None, **fields}
+
+
+def ids(teams) -> list:
+    return sorted(t["id"] for t in teams)
+
+
+def test_new_teams_are_due_immediately():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1), team(2)], now=0)
+    assert ids(scheduler.pop_due(now=0)) == [1, 2]
+    assert scheduler.pop_due(now=0) == []
+
+
+def test_popped_team_without_record_leaves_schedule():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1)], now=0)
+    scheduler.pop_due(now=0)
+    assert scheduler.seconds_until_next(now=0) is None
+
+
+def test_record_reschedules_by_outcome():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1), team(2), team(3)], now=0)
+    scheduler.pop_due(now=0)
+    scheduler.record({1: True, 2: False, 3: None}, now=0)
+
+    assert ids(scheduler.pop_due(now=49)) == []
+    assert ids(scheduler.pop_due(now=50)) == [1]
+    assert ids(scheduler.pop_due(now=100)) == [3]
+    assert ids(scheduler.pop_due(now=150)) == [2]
+
+
+def test_interval_stays_within_bounds():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1)], now=0)
+    now = 0
+    for _ in range(10):
+        scheduler.pop_due(now=now)
+        scheduler.record({1: True}, now=now)
+        now += scheduler.seconds_until_next(now=now)
+    assert scheduler.seconds_until_next(now=now) == 0
+    scheduler.pop_due(now=now)
+    scheduler.record({1: True}, now=now)
+    assert scheduler.seconds_until_next(now=now) == 10
+
+
+def test_requeue_after_failed_batch_keeps_interval():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1), team(2)], now=0)
+    scheduler.requeue(scheduler.pop_due(now=0), now=5)
+    assert scheduler.pop_due(now=104) == []
+    assert ids(scheduler.pop_due(now=105)) == [1, 2]
+
+
+def test_sync_teams_keeps_known_schedule_and_drops_missing():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1), team(2)], now=0)
+    scheduler.pop_due(now=0)
+    scheduler.record({1: False, 2: False}, now=0)
+    scheduler.sync_teams([team(1, fl_slug="renamed")], now=10)
+    assert len(scheduler) == 1
+    due = scheduler.pop_due(now=150)
+    assert due == [team(1, fl_slug="renamed")]
+
+
+def test_national_boost_shortens_interval():
+    scheduler = make_scheduler(national_boost=4)
+    scheduler.sync_teams([team(1, is_national=1), team(2)], now=0)
+    scheduler.pop_due(now=0)
+    scheduler.record({1: None, 2: None}, now=0)
+    assert ids(scheduler.pop_due(now=25)) == [1]
+
+
+def test_invalid_intervals_rejected():
+    with pytest.raises(ValueError):
+        TeamScheduler(base_interval=5, min_interval=10, max_interval=1000)
+
+
+def test_requeue_returns_teams_without_outcome():
+    scheduler = make_scheduler()
+    scheduler.sync_teams([team(1), team(2)], now=0)
+    batch = scheduler.pop_due(now=0)
+    outcomes = {1: True}
+    scheduler.record(outcomes, now=0)
+    scheduler.requeue([t for t in batch if t["id"] not in outcomes], now=0)
+    assert ids(scheduler.pop_due(now=50)) == [1]
+    assert ids(scheduler.pop_due(now=100)) == [2]
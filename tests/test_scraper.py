@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.fakedb import FakeDB
+from hockey_squad_scraper.infrastructure.config import Settings
+from hockey_squad_scraper.repositories.countries_repo import CountriesRepo
+from hockey_squad_scraper.repositories.players_repo import PlayersRepo
+from hockey_squad_scraper.scraping.delta import SquadDelta
+from hockey_squad_scraper.scraping.scraper import SquadScraper
+
+
+def make_scraper() -> SquadScraper:
+    db = FakeDB()
+    db.seed_countries()
+    db.seed_teams([{"id": 1, "fl_id": "T1", "fl_slug": "team-1", "is_national": 1}])
+    db.conn.execute("INSERT INTO hockey_players (id, name, fl_id, team_id) VALUES (5, 'A', 'a', NULL)")
+    db.conn.commit()
+    return SquadScraper(
+        db=db,
+        http=None,
+        teams_repo=None,
+        players_repo=PlayersRepo(db),
+        countries_repo=CountriesRepo(db),
+        cfg=Settings(),
+    )
+
+
+def test_failed_delta_restores_national_status():
+    scraper = make_scraper()
+    team = {"id": 1, "fl_id": "T1", "fl_slug": "team-1", "is_national": 1}
+    delta = SquadDelta(team_id=1, is_club=True)
+    delta.add_transfer(5, None)
+
+    def fail(delta):
+        raise RuntimeError("write failed")
+
+    scraper._write_delta = fail
+    with pytest.raises(RuntimeError):
+        scraper._apply_delta(team, delta)
+    assert team["is_national"] == 1
+    assert scraper.db.conn.execute("SELECT is_national FROM hockey_teams WHERE id = 1").fetchone()[0] == 1
+    assert scraper.players.cache[5].team_id is None
+
+
+def test_applied_delta_flips_national_status():
+    scraper = make_scraper()
+    team = {"id": 1, "fl_id": "T1", "fl_slug": "team-1", "is_national": 1}
+    delta = SquadDelta(team_id=1, is_club=True)
+    delta.add_transfer(5, None)
+    assert scraper._apply_delta(team, delta) is True
+    assert team["is_national"] == 0
+    assert scraper.db.conn.execute("SELECT is_national FROM hockey_teams WHERE id = 1").fetchone()[0] == 0
+    assert scraper.players.cache[5].team_id == 1